@@ -22,6 +22,8 @@ import json
 import argparse
 import base64
 
+import numpy as np
+
 class CubeKeyEncoder:
     """
     Encodes and decodes cube rotation moves between human-readable format and numeric codes.
@@ -72,22 +74,24 @@ class CubeKeyEncoder:
             moves_list (list): List of move sequences, each sequence is a list of moves
             
         Returns:
-            list: List of encoded sequences
+            list: List of encoded sequences, each a uint8 numpy array
         """
         encoded_sequences = []
         
         for sequence in moves_list:
-            encoded_sequence = []
+            known_moves = []
             for move in sequence:
                 if move in self.MOVE_ENCODING:
-                    code = self.MOVE_ENCODING[move]
-                    # Apply encoding scheme
-                    if self.encoding_scheme == "xor":
-                        code = code ^ self.xor_key
-                    encoded_sequence.append(code)
+                    known_moves.append(move)
                 else:
                     print(f"Warning: Unknown move '{move}' skipped")
             
+            encoded_sequence = np.fromiter((self.MOVE_ENCODING[move] for move in known_moves),
+                                           dtype=np.uint8, count=len(known_moves))
+            # Apply encoding scheme to the whole sequence at once
+            if self.encoding_scheme == "xor":
+                encoded_sequence ^= self.xor_key
+            
             encoded_sequences.append(encoded_sequence)
         
         return encoded_sequences
@@ -130,17 +134,20 @@ class CubeKeyEncoder:
         Returns:
             str: Base64 encoded string
         """
-        # Flatten sequences and convert to bytes
-        flat_codes = []
-        for sequence in encoded_sequences:
-            flat_codes.append(len(sequence))  # Store sequence length
-            flat_codes.extend(sequence)
+        # Lay out [length, codes...] per sequence in one preallocated buffer
+        lengths = [len(sequence) for sequence in encoded_sequences]
+        if any(length > 255 for length in lengths):
+            raise ValueError("Base64 format supports at most 255 moves per sequence")
         
-        # Convert to bytes
-        byte_data = bytes(flat_codes)
+        byte_data = np.empty(sum(lengths) + len(lengths), dtype=np.uint8)
+        offset = 0
+        for sequence, length in zip(encoded_sequences, lengths):
+            byte_data[offset] = length  # Store sequence length
+            byte_data[offset + 1:offset + 1 + length] = sequence
+            offset += 1 + length
         
         # Base64 encode
-        return base64.b64encode(byte_data).decode('utf-8')
+        return base64.b64encode(byte_data.tobytes()).decode('utf-8')
     
     def decode_from_base64(self, base64_string):
         """
@@ -150,21 +157,20 @@ class CubeKeyEncoder:
             base64_string (str): Base64 encoded string
             
         Returns:
-            list: List of encoded sequences
+            list: List of encoded sequences, each a uint8 numpy array
         """
         # Base64 decode
-        byte_data = base64.b64decode(base64_string)
+        byte_data = np.frombuffer(base64.b64decode(base64_string), dtype=np.uint8)
         
-        # Reconstruct sequences
+        # Reconstruct sequences as slices of the decoded buffer
         encoded_sequences = []
         index = 0
         
         while index < len(byte_data):
-            seq_length = byte_data[index]
+            seq_length = int(byte_data[index])
             index += 1
             
-            sequence = list(byte_data[index:index + seq_length])
-            encoded_sequences.append(sequence)
+            encoded_sequences.append(byte_data[index:index + seq_length])
             index += seq_length
         
         return encoded_sequences
@@ -187,7 +193,7 @@ class CubeKeyEncoder:
         else:  # JSON format
             data = {
                 "encoding_scheme": self.encoding_scheme,
-                "encoded_sequences": encoded_sequences,
+                "encoded_sequences": [np.asarray(seq).tolist() for seq in encoded_sequences],
                 "metadata": {
                     "total_sequences": len(encoded_sequences),
                     "total_moves": sum(len(seq) for seq in encoded_sequences),
@@ -17,13 +17,28 @@
 # along with this program. If not, see <https://www.gnu.org/licenses/>.
 
 import random
-import copy
 import argparse
 import json
 import os
 import hashlib
+import functools
+import struct
 from typing import List, Tuple, Dict, Any
 
+import numpy as np
+
+try:
+    import xxhash
+
+    def _hash_cells(cells):
+        """64-bit non-cryptographic hash of a contiguous cell buffer"""
+        return xxhash.xxh64_intdigest(cells)
+except ImportError:
+    # xxhash is optional: fall back to an 8-byte BLAKE2b digest
+    def _hash_cells(cells):
+        """64-bit non-cryptographic hash of a contiguous cell buffer"""
+        return int.from_bytes(hashlib.blake2b(cells, digest_size=8).digest(), 'little')
+
 order = 25
 
 # The face Dict
@@ -41,18 +56,136 @@ moveDict = {
     "L1": (0, 1), "L1'": (0, -1), "R1": (1, 1), "R1'": (1, -1),
     "U1": (2, 1), "U1'": (2, -1), "D1": (3, 1), "D1'": (3, -1)
 }
+_BASE_MOVES = dict(moveDict)
+
+@functools.lru_cache(maxsize=None)
+def _larger_cube_moves(order):
+    """Move entries added for cubes of the given order, built once per order"""
+    moves = {}
+    for layer in range(2, order):
+        moves[f"L{layer}"] = (layer * 2, 1)
+        moves[f"L{layer}'"] = (layer * 2, -1)
+        moves[f"R{layer}"] = (layer * 2 + 1, 1)
+        moves[f"R{layer}'"] = (layer * 2 + 1, -1)
+        moves[f"U{layer}"] = (layer * 2 + 2, 1)
+        moves[f"U{layer}'"] = (layer * 2 + 2, -1)
+        moves[f"D{layer}"] = (layer * 2 + 3, 1)
+        moves[f"D{layer}'"] = (layer * 2 + 3, -1)
+    return moves
+
 
 # Functions to add more moves for larger cubes
 def add_moves_for_larger_cubes(order): 
-    for layer in range(2, order):
-        moveDict[f"L{layer}"] = (layer * 2, 1)
-        moveDict[f"L{layer}'"] = (layer * 2, -1)
-        moveDict[f"R{layer}"] = (layer * 2 + 1, 1)
-        moveDict[f"R{layer}'"] = (layer * 2 + 1, -1)
-        moveDict[f"U{layer}"] = (layer * 2 + 2, 1)
-        moveDict[f"U{layer}'"] = (layer * 2 + 2, -1)
-        moveDict[f"D{layer}"] = (layer * 2 + 3, 1)
-        moveDict[f"D{layer}'"] = (layer * 2 + 3, -1)
+    if order > MAX_ORDER:
+        raise ValueError(f"Cube order {order} exceeds the maximum of {MAX_ORDER}")
+    moves = _larger_cube_moves(order)
+    # Repeat calls for an order already covered leave the tables untouched
+    if moves.keys() - moveDict.keys():
+        moveDict.update(moves)
+        _rebuild_move_table()
+
+
+# Every move is packed into one byte: code = layer << 1 | (direction < 0).
+# Read as bit fields that is which << 2 | kind << 1 | (direction < 0), with
+# kind 0 = rotate_LR and 1 = rotate_UD, so the kernels decode a move with
+# shifts and masks. A move and its inverse differ only in bit 0, so
+# inverting is code ^ 1.
+# MOVE_KEYS / MOVE_CODES mirror moveDict in order, and CODE_TO_KEY names each
+# code after the first move that produces it.
+MAX_ORDER = 63  # largest order whose move codes fit in a byte
+MOVE_KEYS = []
+KEY_TO_CODE = {}
+CODE_TO_KEY = {}
+MOVE_CODES = np.empty(0, dtype=np.uint8)
+
+
+def _rebuild_move_table():
+    global MOVE_CODES
+    MOVE_KEYS[:] = moveDict.keys()
+    KEY_TO_CODE.clear()
+    CODE_TO_KEY.clear()
+    for key in MOVE_KEYS:
+        layer, direction = moveDict[key]
+        code = (layer << 1) | (direction < 0)
+        KEY_TO_CODE[key] = code
+        CODE_TO_KEY.setdefault(code, key)
+    MOVE_CODES = np.array([KEY_TO_CODE[key] for key in MOVE_KEYS], dtype=np.uint8)
+
+
+_rebuild_move_table()
+
+
+@functools.lru_cache(maxsize=None)
+def move_codes_for_order(order):
+    """
+    Move codes that keys for cubes of the given order are drawn from
+    
+    Matches MOVE_CODES in a process that has only seen this order, so the
+    draw does not depend on which larger orders were used before.
+    """
+    if order > MAX_ORDER:
+        raise ValueError(f"Cube order {order} exceeds the maximum of {MAX_ORDER}")
+    moves = {**_BASE_MOVES, **_larger_cube_moves(order)}
+    codes = np.array([(layer << 1) | (direction < 0) for layer, direction in moves.values()], dtype=np.uint8)
+    codes.flags.writeable = False
+    return codes
+
+
+def encode_moves(moves):
+    """Convert move names to an array of uint8 move codes, skipping unknown moves"""
+    if isinstance(moves, np.ndarray):
+        return moves
+    # One dict probe per move; unknown names map to 256, which no byte code uses
+    codes = np.fromiter(map(KEY_TO_CODE.get, moves, [256] * len(moves)), dtype=np.uint16, count=len(moves))
+    return codes[codes < 256].astype(np.uint8)
+
+
+def decode_moves(codes):
+    """Convert an array of move codes back to move names"""
+    return [CODE_TO_KEY[code] for code in codes.tolist()]
+
+
+def invert_moves(moves):
+    """Move codes that undo `moves`: reversed, with every direction bit flipped"""
+    return encode_moves(moves)[::-1] ^ 1
+
+
+def _text_to_cells(text):
+    """
+    Encode text as a flat array holding one character code per cell
+
+    Latin-1 text is stored as uint8 so each cell is exactly one byte;
+    other text inside the Basic Multilingual Plane (CJK included) uses
+    uint16, and only text with astral characters falls back to uint32.
+    """
+    try:
+        return np.frombuffer(text.encode('latin-1'), dtype=np.uint8)
+    except UnicodeEncodeError:
+        pass
+    encoded = text.encode('utf-16-le')
+    if len(encoded) == 2 * len(text):
+        # No surrogate pairs, so every character is exactly one uint16
+        return np.frombuffer(encoded, dtype='<u2')
+    return np.frombuffer(text.encode('utf-32-le'), dtype='<u4')
+
+
+# Shared generator for randomness that does not protect the plaintext
+# (key selection); key moves and padding come from os.urandom instead
+_RNG = np.random.default_rng()
+
+# Characters used to pad the last cube
+PADDING_ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789"
+_PADDING_LUT = np.frombuffer(PADDING_ALPHABET.encode('latin-1'), dtype=np.uint8)
+
+
+def _cells_to_text(cells):
+    """Decode an array produced by _text_to_cells back to a string"""
+    # tobytes() flattens in C order, so faces arrays can be passed directly
+    if cells.dtype == np.uint8:
+        return cells.tobytes().decode('latin-1')
+    if cells.dtype == np.uint16:
+        return cells.astype('<u2', copy=False).tobytes().decode('utf-16-le')
+    return cells.astype('<u4', copy=False).tobytes().decode('utf-32-le')
 
 
 class Cube:
@@ -60,54 +193,45 @@ class Cube:
         self.order = order
         # Face Sequence: Front, Top, Back, Down, Left, Right
         self.face_names = ["F", "T", "B", "D", "L", "R"]
-        if cube_data:
+        if isinstance(cube_data, np.ndarray):
+            # Already-encoded cells are used as-is (initCube hands in views)
+            self.faces = cube_data.reshape(6, order, order)
+        elif cube_data:
             self.faces = self._linear_to_faces(cube_data)
         else:
-            self.faces = [[['' for _ in range(order)] for _ in range(order)] for _ in range(6)]
+            self.faces = np.zeros((6, order, order), dtype=np.uint8)
     
     def _linear_to_faces(self, linear_data):
         n = self.order
-        faces = [[['' for _ in range(n)] for _ in range(n)] for _ in range(6)]
-        
-        for idx, char in enumerate(linear_data):
-            if idx >= len(linear_data):
-                break
-            face_idx = idx // (n * n)
-            if face_idx >= 6:
-                break
-            pos_in_face = idx % (n * n)
-            row = pos_in_face // n
-            col = pos_in_face % n
-            if row < n and col < n:
-                faces[face_idx][row][col] = char
-        
-        return faces
+        cells = _text_to_cells(''.join(linear_data))[:6 * n * n]
+        faces = np.zeros(6 * n * n, dtype=cells.dtype)
+        faces[:cells.size] = cells
+        return faces.reshape(6, n, n)
     
     def _faces_to_linear(self):
-        n = self.order
-        linear_data = []
-        for face_idx in range(6):
-            for row in range(n):
-                for col in range(n):
-                    linear_data.append(self.faces[face_idx][row][col])
-        return linear_data
+        return _cells_to_text(self.faces)
+    
+    def clone(self):
+        """Return an independent copy of this cube"""
+        new_cube = Cube.__new__(Cube)
+        new_cube.order = self.order
+        new_cube.face_names = self.face_names
+        new_cube.faces = self.faces.copy()
+        return new_cube
     
     def rotate_LR(self, which, direction):
         n = self.order
         if which < 0 or which >= n:
             return
+        f = self.faces
+        back = n - 1 - which
             
         if direction == 1:  # Clockwise
-            temp = [self.faces[0][r][which] for r in range(n)]
-            
-            for r in range(n):
-                self.faces[0][r][which] = self.faces[3][n-1-r][n-1-which]
-            for r in range(n):
-                self.faces[3][n-1-r][n-1-which] = self.faces[2][r][n-1-which]
-            for r in range(n):
-                self.faces[2][r][n-1-which] = self.faces[1][n-1-r][which]
-            for r in range(n):
-                self.faces[1][r][which] = temp[r]
+            temp = f[0, :, which].copy()
+            f[0, :, which] = f[3, ::-1, back]
+            f[3, ::-1, back] = f[2, :, back]
+            f[2, :, back] = f[1, ::-1, which]
+            f[1, :, which] = temp
             
             if which == 0:
                 self._rotate_face(4, 1)
@@ -115,16 +239,11 @@ class Cube:
                 self._rotate_face(5, 1)
                 
         else:  # Counter-clockwise
-            temp = [self.faces[0][r][which] for r in range(n)]
-            
-            for r in range(n):
-                self.faces[0][r][which] = self.faces[1][r][which]
-            for r in range(n):
-                self.faces[1][r][which] = self.faces[2][n-1-r][n-1-which]
-            for r in range(n):
-                self.faces[2][n-1-r][n-1-which] = self.faces[3][r][n-1-which]
-            for r in range(n):
-                self.faces[3][r][n-1-which] = temp[n-1-r]
+            temp = f[0, :, which].copy()
+            f[0, :, which] = f[1, :, which]
+            f[1, :, which] = f[2, ::-1, back]
+            f[2, ::-1, back] = f[3, :, back]
+            f[3, :, back] = temp[::-1]
             
             if which == 0:
                 self._rotate_face(4, -1)
@@ -135,18 +254,14 @@ class Cube:
         n = self.order
         if which < 0 or which >= n:
             return
+        f = self.faces
             
         if direction == 1:  # Clockwise
-            temp = self.faces[0][which][:]
-            
-            for c in range(n):
-                self.faces[0][which][c] = self.faces[5][which][c]
-            for c in range(n):
-                self.faces[5][which][c] = self.faces[2][which][c]
-            for c in range(n):
-                self.faces[2][which][c] = self.faces[4][which][c]
-            for c in range(n):
-                self.faces[4][which][c] = temp[c]
+            temp = f[0, which].copy()
+            f[0, which] = f[5, which]
+            f[5, which] = f[2, which]
+            f[2, which] = f[4, which]
+            f[4, which] = temp
             
             if which == 0:
                 self._rotate_face(1, 1)
@@ -154,16 +269,11 @@ class Cube:
                 self._rotate_face(3, 1)
                 
         else:  # Counter-clockwise
-            temp = self.faces[0][which][:]
-            
-            for c in range(n):
-                self.faces[0][which][c] = self.faces[4][which][c]
-            for c in range(n):
-                self.faces[4][which][c] = self.faces[2][which][c]
-            for c in range(n):
-                self.faces[2][which][c] = self.faces[5][which][c]
-            for c in range(n):
-                self.faces[5][which][c] = temp[c]
+            temp = f[0, which].copy()
+            f[0, which] = f[4, which]
+            f[4, which] = f[2, which]
+            f[2, which] = f[5, which]
+            f[5, which] = temp
             
             if which == 0:
                 self._rotate_face(1, -1)
@@ -171,28 +281,16 @@ class Cube:
                 self._rotate_face(3, -1)
     
     def _rotate_face(self, face_idx, direction):
-        n = self.order
         if face_idx < 0 or face_idx >= 6:
             return
             
-        face = [row[:] for row in self.faces[face_idx]]
-        new_face = [['' for _ in range(n)] for _ in range(n)]
-        
-        if direction == 1:
-            for r in range(n):
-                for c in range(n):
-                    new_face[c][n-1-r] = face[r][c]
-        else:
-            for r in range(n):
-                for c in range(n):
-                    new_face[n-1-c][r] = face[r][c]
-        
-        self.faces[face_idx] = new_face
+        # Clockwise is a -90 degree turn in np.rot90 terms
+        k = -1 if direction == 1 else 1
+        self.faces[face_idx] = np.ascontiguousarray(np.rot90(self.faces[face_idx], k=k))
     
     def get_state_hash(self):
-        """Get a hash of current cube state for verification"""
-        state_string = ''.join(self.cube)
-        return hashlib.md5(state_string.encode()).hexdigest()[:8]
+        """Get an integer hash of current cube state for verification"""
+        return _hash_cells(np.ascontiguousarray(self.faces))
     
     @property
     def cube(self):
@@ -205,66 +303,207 @@ class Cube:
 
 def initCube(cubeString, order=7):
     cubeString = cubeString.replace(" ", "").replace("\n", "")
-    totalChars = len(cubeString)
+    return _cubes_from_text(cubeString, order)
+
+
+def _cubes_from_text(text, order):
+    """Split text into cubes of the given order, keeping every character"""
+    data = _text_to_cells(text)
+    totalChars = data.size
     charsPerCube = order * order * 6
     numCubes = (totalChars + charsPerCube - 1) // charsPerCube
 
-    cubes = []
-    for i in range(numCubes):
-        cube_data = []
-        for j in range(charsPerCube):
-            charIndex = i * charsPerCube + j
-            if charIndex < totalChars:
-                ch = cubeString[charIndex]
-            else:
-                ch = random.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789")
-            cube_data.append(ch)
-        cubes.append(Cube(order, cube_data))
-    return cubes
+    # Fill the tail of the last cube with random alphanumerics in one draw;
+    # padding ends up mixed into the ciphertext, so it uses the CSPRNG too
+    padLen = numCubes * charsPerCube - totalChars
+    pad = _PADDING_LUT[_urandom_indices(padLen, len(_PADDING_LUT))]
+    full = np.concatenate([data, pad.astype(data.dtype)]).reshape(numCubes, 6, order, order)
+
+    return [Cube(order, full[i]) for i in range(numCubes)]
 
 
 def cubeToString(cube):
-    return ''.join(cube.cube)
+    return cube.cube
 
 
-def generateRandomMoves(numMoves):
-    moves = list(moveDict.keys())
-    randomMoves = random.choices(moves, k=numMoves)
-    return randomMoves
+def _urandom_indices(count, bound):
+    """
+    Draw `count` uniform integers in [0, bound) from os.urandom
+    
+    Raw 16-bit values at or above the largest multiple of `bound` are
+    rejected so the modulo carries no bias.
+    """
+    limit = 65536 - 65536 % bound
+    indices = np.empty(0, dtype=np.uint16)
+    while indices.size < count:
+        raw = np.frombuffer(os.urandom((count - indices.size) * 2), dtype=np.uint16)
+        indices = np.concatenate([indices, raw[raw < limit]])
+    return indices[:count] % bound
 
 
-def applyMoves(cube, moves):
-    for move in moves:
-        if move in moveDict:
-            layer, direction = moveDict[move]
-            if layer % 2 == 0:
-                which = layer // 2
-                cube.rotate_LR(which, direction)
-            else:
-                which = layer // 2
-                cube.rotate_UD(which, direction)
-    return cube
+def _keystream_indices(seed, count, bound):
+    """
+    Expand `seed` with SHAKE-128 into `count` uniform integers in [0, bound)
+    
+    Uses the same rejection rule as _urandom_indices. A longer SHAKE output
+    starts with the shorter one, so the result depends only on the seed.
+    """
+    limit = 65536 - 65536 % bound
+    num_bytes = count * 2
+    while True:
+        raw = np.frombuffer(hashlib.shake_128(seed).digest(num_bytes), dtype='<u2')
+        accepted = raw[raw < limit]
+        if accepted.size >= count:
+            return accepted[:count] % bound
+        num_bytes += (count - accepted.size) * 4 + 64
 
 
-def decryptCube(cube, moves):
-    reverseMoves = []
-    for move in reversed(moves):
-        if move.endswith("'"):
-            reverseMove = move[:-1]
+def generateRandomMoves(numMoves, order=None):
+    """
+    Draw numMoves random moves as move codes; use decode_moves() for the names
+    
+    With an order, moves come from move_codes_for_order(order) rather than
+    the current moveDict.
+    """
+    codes = MOVE_CODES if order is None else move_codes_for_order(order)
+    return codes[_urandom_indices(numMoves, len(codes))]
+
+
+@functools.lru_cache(maxsize=None)
+def move_permutations(order):
+    """
+    Per-move gather table for cubes of the given order
+    
+    Row `code` holds, for every position of the flattened (6, order, order)
+    buffer, the position its cell comes from, so a move is `flat[table[code]]`.
+    Each row is found by running the move once on a cube of position indices.
+    Codes >= 4 * order address layers beyond the cube and are no-ops.
+    """
+    n = order
+    table = np.empty((4 * n, 6 * n * n), dtype=np.int32)
+    for code in range(4 * n):
+        which = code >> 2
+        direction = -1 if code & 1 else 1
+        index_cube = Cube(n, np.arange(6 * n * n, dtype=np.int32))
+        if code & 2:
+            index_cube.rotate_UD(which, direction)
         else:
-            reverseMove = move + "'"
-        reverseMoves.append(reverseMove)
+            index_cube.rotate_LR(which, direction)
+        table[code] = index_cube.faces.reshape(-1)
+    table.flags.writeable = False
+    return table
+
+
+# Batches moving fewer cells than this compose with the NumPy tables: they
+# finish before importing Numba (let alone a cold kernel compile) would
+_KERNEL_MIN_WORK = 1 << 25
+
+
+@functools.lru_cache(maxsize=None)
+def _batch_kernel():
+    """The Numba batch move kernel, or None without Numba; cube_kernel is imported on first use"""
+    import cube_kernel
+    return cube_kernel.apply_moves_batch_nb if cube_kernel.HAS_NUMBA else None
+
+
+def compose_many(code_lists, order):
+    """
+    Collapse each move-code list into one gather permutation
     
-    decryptedCube = applyMoves(copy.deepcopy(cube), reverseMoves)
+    Row i of the result satisfies: applying code_lists[i] to a flattened
+    cube equals `flat[perms[i]]`. Large batches with Numba available are
+    composed in parallel by running the move kernel on position-index
+    cubes; otherwise the per-move tables from move_permutations() are chained.
+    """
+    n = order
+    size = 6 * n * n
+    perms = np.tile(np.arange(size, dtype=np.int32), (len(code_lists), 1))
+    if not code_lists:
+        return perms
+    # Codes >= 4 * n address layers beyond this cube and are no-ops; drop
+    # them here so the kernels never see an out-of-range row or column
+    code_lists = [codes[codes < 4 * n] for codes in code_lists]
+    lengths = [len(codes) for codes in code_lists]
+
+    kernel = _batch_kernel() if sum(lengths) * size >= _KERNEL_MIN_WORK else None
+    if kernel is not None:
+        offsets = np.zeros(len(code_lists) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        kernel(perms.reshape(-1, 6, n, n), np.concatenate(code_lists), offsets)
+        return perms
+
+    table = move_permutations(order)
+    for i, codes in enumerate(code_lists):
+        composed = perms[i]
+        for code in codes.tolist():
+            composed = composed[table[code]]
+        perms[i] = composed
+    return perms
+
+
+def compose_moves(moves, order):
+    """Single gather permutation equivalent to applying `moves` in order"""
+    return compose_many([encode_moves(moves)], order)[0]
+
+
+def invert_permutation(perm):
+    """Permutation that undoes `perm`, built with one scatter"""
+    inverse = np.empty_like(perm)
+    inverse[perm] = np.arange(perm.size, dtype=perm.dtype)
+    return inverse
+
+
+def _apply_permutation(cube, perm):
+    cube.faces = cube.faces.reshape(-1)[perm].reshape(6, cube.order, cube.order)
+    return cube
+
+
+def applyMoves(cube, moves):
+    return _apply_permutation(cube, compose_moves(moves, cube.order))
+
+
+def apply_permutations(cubes, perms):
+    """
+    Permute cubes[i] by perms[i] for every cube (all cubes share one order)
+    
+    The whole batch is permuted with a single gather over a
+    (num_cubes, 6*n*n) buffer; each cube's faces becomes a view into it.
+    """
+    if not cubes:
+        return cubes
+    n = cubes[0].order
+    all_faces = np.take_along_axis(np.stack([cube.faces.reshape(-1) for cube in cubes]), perms, axis=1)
+    for cube, faces in zip(cubes, all_faces):
+        cube.faces = faces.reshape(6, n, n)
+    return cubes
+
+
+def apply_move_codes(cubes, code_lists):
+    """Apply code_lists[i] to cubes[i], composing every list into a permutation first"""
+    if not cubes:
+        return cubes
+    return apply_permutations(cubes, compose_many(code_lists, cubes[0].order))
+
+
+def decryptCube(cube, moves):
+    perm = invert_permutation(compose_moves(moves, cube.order))
+    decryptedCube = _apply_permutation(cube.clone(), perm)
     return decryptedCube
 
 
 def encryptCube(cube, moves):
-    encryptedCube = applyMoves(copy.deepcopy(cube), moves)
+    encryptedCube = applyMoves(cube.clone(), moves)
     return encryptedCube
 
 
-def generate_key_pool(num_cubes, moves_per_key=20, pool_multiplier=6):
+def expand_key_seed(seed, pool_size, moves_per_key, order=None):
+    """Deterministically expand a key seed into pool_size keys of move codes (see generateRandomMoves for order)"""
+    codes = MOVE_CODES if order is None else move_codes_for_order(order)
+    indices = _keystream_indices(seed, pool_size * moves_per_key, len(codes))
+    return list(codes[indices].reshape(pool_size, moves_per_key))
+
+
+def generate_key_pool(num_cubes, moves_per_key=20, pool_multiplier=6, seed=None, order=None):
     """
     Generate a pool of random keys for encryption
     
@@ -272,19 +511,23 @@ def generate_key_pool(num_cubes, moves_per_key=20, pool_multiplier=6):
         num_cubes: Number of cubes to encrypt
         moves_per_key: Number of moves per key
         pool_multiplier: Size of key pool (num_cubes * pool_multiplier)
+        seed: Optional secret bytes; when given, the whole pool is expanded
+              from it with expand_key_seed() instead of drawn key by key
+        order: Optional cube order; moves are then drawn from
+               move_codes_for_order(order) instead of the current moveDict
     
     Returns:
         List of random move sequences
     """
     pool_size = num_cubes * pool_multiplier
-    key_pool = []
     
     print(f"Generating key pool with {pool_size} keys...")
-    for i in range(pool_size):
-        moves = generateRandomMoves(moves_per_key)
-        key_pool.append(moves)
-    
-    return key_pool
+    if seed is not None:
+        return expand_key_seed(seed, pool_size, moves_per_key, order)
+
+    # One os.urandom draw for the whole pool, split into one row per key
+    moves = generateRandomMoves(pool_size * moves_per_key, order)
+    return list(moves.reshape(pool_size, moves_per_key))
 
 
 def selective_encrypt(cubes, key_pool, selection_method="random"):
@@ -299,30 +542,51 @@ def selective_encrypt(cubes, key_pool, selection_method="random"):
     Returns:
         Tuple of (encrypted_cubes, used_key_indices)
     """
-    encrypted_cubes = []
     used_key_indices = []
     
     for i, cube in enumerate(cubes):
         if selection_method == "random":
-            key_index = random.randint(0, len(key_pool) - 1)
+            key_index = int(_RNG.integers(len(key_pool)))
         elif selection_method == "sequential":
             key_index = i % len(key_pool)
         elif selection_method == "hash_based":
-            cube_hash = cube.get_state_hash()
-            key_index = int(cube_hash, 16) % len(key_pool)
+            key_index = cube.get_state_hash() % len(key_pool)
         else:
             key_index = i % len(key_pool)
-        
-        selected_moves = key_pool[key_index]
-        encrypted_cube = encryptCube(cube, selected_moves)
-        encrypted_cubes.append(encrypted_cube)
         used_key_indices.append(key_index)
-        
-        print(f"Cube {i} encrypted with key {key_index} ({len(selected_moves)} moves)")
+    
+    encrypted_cubes = [cube.clone() for cube in cubes]
+    apply_move_codes(encrypted_cubes, [encode_moves(key_pool[key_index]) for key_index in used_key_indices])
+    
+    for i, key_index in enumerate(used_key_indices):
+        print(f"Cube {i} encrypted with key {key_index} ({len(key_pool[key_index])} moves)")
     
     return encrypted_cubes, used_key_indices
 
 
+# Punctuation counted as readable next to alphanumerics when scoring trials
+_READABLE_PUNCTUATION = ' .,!?;:\'"-'
+
+
+def _is_readable(char):
+    return char.isalnum() or char in _READABLE_PUNCTUATION
+
+
+_READABLE_LUT = np.array([_is_readable(chr(code)) for code in range(256)], dtype=np.uint8)
+
+
+def _readability_scores(cells):
+    """Fraction of readable characters along the last axis of a cell array"""
+    if cells.dtype == np.uint8:
+        readable = _READABLE_LUT[cells]
+    else:
+        # Wide cells: classify each distinct code point once, then gather
+        values, inverse = np.unique(cells, return_inverse=True)
+        flags = np.array([_is_readable(chr(value)) for value in values.tolist()], dtype=np.uint8)
+        readable = flags[inverse].reshape(cells.shape)
+    return readable.mean(axis=-1)
+
+
 def brute_force_decrypt(encrypted_cubes, key_pool, max_attempts_per_cube=10):
     """
     Attempt to decrypt cubes using multiple keys from the pool
@@ -336,35 +600,35 @@ def brute_force_decrypt(encrypted_cubes, key_pool, max_attempts_per_cube=10):
         List of decryption results with probabilities
     """
     results = []
+    if not encrypted_cubes:
+        return results
+    n = encrypted_cubes[0].order
+    attempts = min(max_attempts_per_cube, len(key_pool))
     
-    for i, encrypted_cube in enumerate(encrypted_cubes):
+    # Pick the keys each cube will try up front, never the same key twice
+    key_indices = np.array([random.sample(range(len(key_pool)), attempts)
+                            for _ in encrypted_cubes], dtype=np.intp).reshape(len(encrypted_cubes), attempts)
+    
+    # Compose the inverse of every key tried, then run every (cube, attempt)
+    # trial with a single gather over the stacked ciphertexts
+    tried_keys, slots = np.unique(key_indices, return_inverse=True)
+    inverse_perms = compose_many([invert_moves(key_pool[k]) for k in tried_keys.tolist()], n)
+    encrypted = np.stack([cube.faces.reshape(-1) for cube in encrypted_cubes])
+    decrypted = np.take_along_axis(encrypted[:, None, :], inverse_perms[slots.reshape(key_indices.shape)], axis=2)
+    # Readability score (simple heuristic) for every trial in one pass
+    scores = _readability_scores(decrypted)
+    
+    for i in range(len(encrypted_cubes)):
         cube_results = []
-        attempts = min(max_attempts_per_cube, len(key_pool))
-        
-        # Try multiple random keys
-        tested_indices = set()
-        for attempt in range(attempts):
-            # Ensure we don't test the same key twice
-            available_indices = [idx for idx in range(len(key_pool)) if idx not in tested_indices]
-            if not available_indices:
-                break
-                
-            key_index = random.choice(available_indices)
-            tested_indices.add(key_index)
-            
+        for attempt, key_index in enumerate(key_indices[i].tolist()):
             test_moves = key_pool[key_index]
-            decrypted_cube = decryptCube(encrypted_cube, test_moves)
-            decrypted_string = cubeToString(decrypted_cube)
-            
-            # Calculate readability score (simple heuristic)
-            readable_chars = sum(1 for c in decrypted_string if c.isalnum() or c in ' .,!?;:\'"-')
-            readability_score = readable_chars / len(decrypted_string)
+            decrypted_string = _cells_to_text(decrypted[i, attempt])
             
             cube_results.append({
                 'key_index': key_index,
                 'decrypted_text': decrypted_string,
-                'readability_score': readability_score,
-                'key_moves': test_moves
+                'readability_score': float(scores[i, attempt]),
+                'key_moves': decode_moves(encode_moves(test_moves))
             })
         
         # Sort by readability score
@@ -379,11 +643,120 @@ def brute_force_decrypt(encrypted_cubes, key_pool, max_attempts_per_cube=10):
     return results
 
 
+def _cube_utf8(cube):
+    """UTF-8 bytes of a cube's text; ASCII uint8 cells already are UTF-8"""
+    if cube.faces.dtype == np.uint8 and cube.faces.max() < 0x80:
+        return cube.faces.tobytes()
+    return cube.cube.encode('utf-8')
+
+
+def _cubes_utf8(cubes):
+    """One line of UTF-8 text per cube, joined into a single bytes object"""
+    return b"".join(part for cube in cubes for part in (_cube_utf8(cube), b"\n"))
+
+
+def write_cubes(path, cubes):
+    """Write one line of text per cube, UTF-8 encoded, in a single buffered write"""
+    data = _cubes_utf8(cubes)
+    with open(path, 'wb', buffering=1 << 20) as of:
+        of.write(data)
+
+
+# Binary key file: magic, u32 header length, JSON header (everything but the
+# key pool), then per key a u32 move count followed by one byte per move code.
+# Pools expanded from a 'key_seed' stop after the header; the loader
+# re-expands them from the seed.
+KEY_FILE_MAGIC = b"CUBEKEY1"
+
+
+def key_data_header(key_data):
+    """key_data without the pool: all a seeded key needs, and the binary key file header"""
+    return {k: v for k, v in key_data.items() if k != 'key_pool'}
+
+
+def _expand_seeded_pool(key_data, order=None):
+    """Re-expand a seeded key_data's pool, checking it was drawn from the same move table"""
+    move_count = len(MOVE_KEYS) if order is None else len(move_codes_for_order(order))
+    if key_data['move_count'] != move_count:
+        raise ValueError("Key seed was expanded with a different move table")
+    metadata = key_data['metadata']
+    return expand_key_seed(bytes.fromhex(key_data['key_seed']),
+                           metadata['key_pool_size'], metadata['moves_per_key'], order)
+
+
+def _key_pool_codes(key_data, order):
+    """key_data's pool as move codes, from move codes or names, or re-expanded from its seed"""
+    if 'key_pool' not in key_data:
+        return _expand_seeded_pool(key_data, order)
+    return [encode_moves(moves) for moves in key_data['key_pool']]
+
+
+def key_data_to_json(key_data):
+    """Copy of key_data with the pool as move names, the layout of JSON key files"""
+    return dict(key_data, key_pool=[decode_moves(encode_moves(moves)) for moves in key_data['key_pool']])
+
+
+def save_key_file(path, key_data, legacy_json=False):
+    """Save key data in the binary key format, or as the older JSON layout of move names"""
+    if legacy_json:
+        json_data = key_data_to_json(key_data)
+        with open(path, 'w') as kf:
+            json.dump(json_data, kf, separators=(',', ':'))
+        return
+
+    header = json.dumps(key_data_header(key_data)).encode('utf-8')
+    parts = [KEY_FILE_MAGIC, struct.pack('<I', len(header)), header]
+    if 'key_seed' not in key_data:
+        for moves in key_data['key_pool']:
+            codes = encode_moves(moves)
+            parts.append(struct.pack('<I', len(codes)))
+            parts.append(codes.tobytes())
+    with open(path, 'wb') as kf:
+        kf.write(b"".join(parts))
+
+
+def load_key_file(path, order=None):
+    """
+    Load a key file written by save_key_file (binary or JSON, detected by magic)
+    
+    The returned key_pool always holds uint8 move-code arrays. Move names in
+    JSON files are resolved against the current moveDict; seeded pools are
+    re-expanded for the given cube order (see expand_key_seed).
+    """
+    with open(path, 'rb') as kf:
+        raw = kf.read()
+
+    if not raw.startswith(KEY_FILE_MAGIC):
+        key_data = json.loads(raw.decode('utf-8'))
+        key_data['key_pool'] = [encode_moves(moves) for moves in key_data['key_pool']]
+        return key_data
+
+    buf = np.frombuffer(raw, dtype=np.uint8)
+    pos = len(KEY_FILE_MAGIC)
+    (header_len,) = struct.unpack_from('<I', raw, pos)
+    pos += 4
+    key_data = json.loads(raw[pos:pos + header_len].decode('utf-8'))
+    pos += header_len
+
+    if 'key_seed' in key_data:
+        key_data['key_pool'] = _expand_seeded_pool(key_data, order)
+        return key_data
+
+    key_pool = []
+    while pos < len(raw):
+        (length,) = struct.unpack_from('<I', raw, pos)
+        pos += 4
+        key_pool.append(buf[pos:pos + length])
+        pos += length
+    key_data['key_pool'] = key_pool
+    return key_data
+
+
 def save_decryption_results(results, output_dir):
     """Save brute force decryption results to files"""
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
+    os.makedirs(output_dir, exist_ok=True)
     
+    cube_prefix = os.path.join(output_dir, "cube_")
     summary = []
     for result in results:
         cube_index = result['cube_index']
@@ -391,12 +764,12 @@ def save_decryption_results(results, output_dir):
         
         if best_result:
             # Save best result
-            best_file = os.path.join(output_dir, f"cube_{cube_index}_best.txt")
+            best_file = f"{cube_prefix}{cube_index}_best.txt"
             with open(best_file, 'w') as f:
                 f.write(best_result['decrypted_text'])
             
             # Save all attempts
-            all_file = os.path.join(output_dir, f"cube_{cube_index}_all_attempts.json")
+            all_file = f"{cube_prefix}{cube_index}_all_attempts.json"
             with open(all_file, 'w') as f:
                 json.dump(result['all_results'], f, indent=2, ensure_ascii=False)
             
@@ -415,6 +788,99 @@ def save_decryption_results(results, output_dir):
     return summary
 
 
+def _encrypt_cubes(cubes, num_moves, key_pool_multiplier, selection_method):
+    """Encrypt cubes with a fresh seeded key pool; returns (encrypted_cubes, key_data)"""
+    # Generate key pool from one secret seed; the key file stores the seed
+    key_seed = os.urandom(32)
+    cube_order = cubes[0].order if cubes else order
+    key_pool = generate_key_pool(len(cubes), num_moves, key_pool_multiplier, seed=key_seed, order=cube_order)
+    
+    # Encrypt cubes using selective keys
+    encrypted_cubes, used_key_indices = selective_encrypt(cubes, key_pool, selection_method)
+    
+    key_data = {
+        'key_pool': key_pool,
+        'key_seed': key_seed.hex(),
+        'move_count': len(move_codes_for_order(cube_order)),
+        'used_key_indices': used_key_indices,
+        'selection_method': selection_method,
+        'metadata': {
+            'num_cubes': len(cubes),
+            'key_pool_size': len(key_pool),
+            'moves_per_key': num_moves,
+            'encryption_date': str(os.path.getctime(__file__))
+        }
+    }
+    return encrypted_cubes, key_data
+
+
+def _decrypt_cubes(cubes, key_data):
+    """Decrypt cubes in place with the keys recorded in key_data"""
+    key_pool = key_data['key_pool']
+    used_key_indices = key_data['used_key_indices']
+    
+    # Invert each distinct key once, however many cubes share it;
+    # cubes without a key (-1) get the identity
+    cube_keys = [used_key_indices[i] if i < len(used_key_indices) else -1 for i in range(len(cubes))]
+    distinct_keys, slots = np.unique(np.array(cube_keys, dtype=np.intp), return_inverse=True)
+    code_lists = [invert_moves(key_pool[k]) if k >= 0 else MOVE_CODES[:0] for k in distinct_keys.tolist()]
+    if cubes:
+        apply_permutations(cubes, compose_many(code_lists, cubes[0].order)[slots.reshape(-1)])
+    
+    for i in range(len(cubes)):
+        if i < len(used_key_indices):
+            print(f"Cube {i} decrypted with key {used_key_indices[i]}")
+        else:
+            print(f"Warning: No key available for cube {i}")
+    return cubes
+
+
+def _cubes_text(cubes):
+    """All cubes' text back to back; the library API has no line framing"""
+    return "".join(cube.cube for cube in cubes)
+
+
+def encrypt_text(text, cube_order=order, num_moves=20, key_pool_multiplier=6, selection_method="random"):
+    """
+    Encrypt text in-process, the library form of `-mode encrypt`
+    
+    Unlike the CLI, whitespace is kept: every character of text is
+    encrypted, and the last cube is padded to a whole cube.
+    
+    Returns:
+        Tuple of (encrypted text, the cubes back to back; key data). The key
+        data's pool holds move codes; key_data_to_json() gives the JSON layout.
+    """
+    add_moves_for_larger_cubes(cube_order)
+    cubes = _cubes_from_text(text, cube_order)
+    encrypted_cubes, key_data = _encrypt_cubes(cubes, num_moves, key_pool_multiplier, selection_method)
+    return _cubes_text(encrypted_cubes), key_data
+
+
+def decrypt_text(encrypted_text, key_data, cube_order=order):
+    """
+    Decrypt text in-process, the library form of `-mode decrypt`
+    
+    encrypted_text is encrypt_text() output, taken as is. key_data may
+    hold the pool as move codes or as move names, or no pool but the
+    seed (key_data_header()), which is re-expanded for cube_order. The
+    result still carries the last cube's padding.
+    """
+    add_moves_for_larger_cubes(cube_order)
+    cubes = _cubes_from_text(encrypted_text, cube_order)
+    key_data = dict(key_data, key_pool=_key_pool_codes(key_data, cube_order))
+    return _cubes_text(_decrypt_cubes(cubes, key_data))
+
+
+def bruteforce_text(encrypted_text, key_data, cube_order=order, max_attempts=10, results_dir="decryption_results"):
+    """Brute force text in-process, the library form of `-mode bruteforce`; returns the summary"""
+    add_moves_for_larger_cubes(cube_order)
+    cubes = _cubes_from_text(encrypted_text, cube_order)
+    key_pool = _key_pool_codes(key_data, cube_order)
+    results = brute_force_decrypt(cubes, key_pool, max_attempts)
+    return save_decryption_results(results, results_dir)
+
+
 def main():
     parser = argparse.ArgumentParser(description="Enhanced Cube Encryption and Decryption Tool")
     parser.add_argument("-mode", choices=["encrypt", "decrypt", "bruteforce"], required=True, 
@@ -430,6 +896,8 @@ def main():
     parser.add_argument("--max_attempts", type=int, default=10, help="Max attempts per cube for bruteforce")
     parser.add_argument("--results_dir", type=str, default="decryption_results", 
                        help="Directory for bruteforce results")
+    parser.add_argument("--legacy_json", action="store_true",
+                       help="Save the key file as JSON move names instead of the binary key format")
     
     args = parser.parse_args()
 
@@ -442,9 +910,9 @@ def main():
         exit(1)
 
     if args.file:
-        with open(args.file, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-            inputString = ''.join(line.strip() for line in lines)
+        # Drop whitespace on the raw bytes (C speed) before decoding once
+        with open(args.file, 'rb') as f:
+            inputString = f.read().translate(None, b' \t\r\n').decode('utf-8')
     else:
         inputString = args.string
 
@@ -453,42 +921,22 @@ def main():
     cubes = initCube(inputString, order)
 
     if args.mode == "encrypt":
-        # Generate key pool
-        key_pool = generate_key_pool(len(cubes), args.num_moves, args.key_pool_size)
+        encrypted_cubes, key_data = _encrypt_cubes(cubes, args.num_moves, args.key_pool_size, args.selection)
+        key_pool = key_data['key_pool']
         
-        # Encrypt cubes using selective keys
-        encrypted_cubes, used_key_indices = selective_encrypt(cubes, key_pool, args.selection)
-        
-        # Save keys and encrypted data
-        key_data = {
-            'key_pool': key_pool,
-            'used_key_indices': used_key_indices,
-            'selection_method': args.selection,
-            'metadata': {
-                'num_cubes': len(cubes),
-                'key_pool_size': len(key_pool),
-                'moves_per_key': args.num_moves,
-                'encryption_date': str(os.path.getctime(__file__))
-            }
-        }
-        
-        with open(args.key, 'w') as kf:
-            json.dump(key_data, kf, indent=2)
+        save_key_file(args.key, key_data, args.legacy_json)
 
-        with open(args.output, 'w') as of:
-            for cube in encrypted_cubes:
-                of.write(cubeToString(cube) + "\n")
+        write_cubes(args.output, encrypted_cubes)
 
         print(f"Encryption complete. Encrypted {len(cubes)} cubes using {len(key_pool)} key pool.")
         print(f"Output: {args.output}, Keys: {args.key}")
 
     elif args.mode == "decrypt":
         try:
-            with open(args.key, 'r') as kf:
-                key_data = json.load(kf)
-            
+            key_data = load_key_file(args.key, order)
             key_pool = key_data['key_pool']
-            used_key_indices = key_data['used_key_indices']
+            if 'used_key_indices' not in key_data:
+                raise ValueError("key file has no used_key_indices")
             
         except Exception as e:
             print(f"Error reading key file: {e}")
@@ -496,26 +944,15 @@ def main():
 
         print(f"Decrypting {len(cubes)} cubes with {len(key_pool)} key pool...")
         
-        for i, cube in enumerate(cubes):
-            if i < len(used_key_indices):
-                key_index = used_key_indices[i]
-                moves = key_pool[key_index]
-                decrypted_cube = decryptCube(cube, moves)
-                cube.cube = decrypted_cube.cube
-                print(f"Cube {i} decrypted with key {key_index}")
-            else:
-                print(f"Warning: No key available for cube {i}")
-
-        with open(args.output, 'w') as of:
-            for cube in cubes:
-                of.write(cubeToString(cube) + "\n")
+        _decrypt_cubes(cubes, key_data)
+
+        write_cubes(args.output, cubes)
 
         print(f"Decryption complete. Output: {args.output}")
 
     elif args.mode == "bruteforce":
         try:
-            with open(args.key, 'r') as kf:
-                key_data = json.load(kf)
+            key_data = load_key_file(args.key, order)
             key_pool = key_data['key_pool']
         except Exception as e:
             print(f"Error reading key file: {e}")
@@ -7,35 +7,150 @@
 
 import os
 import json
-import random
-import tempfile
-import shutil
-import subprocess
+import argparse
+import secrets
+import importlib
 import sys
-from datetime import datetime
+import contextlib
+import time
 import math
+import mmap
+from collections import namedtuple
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:
+    # orjson is optional: .cube files fall back to the standard json module
+    orjson = None
+
+try:
+    import ijson
+except ImportError:
+    # ijson is optional: without it .cube files are parsed whole before decrypting
+    ijson = None
+
+def _random_words(count):
+    """
+    `count` uniform 32-bit integers from a single secrets.token_bytes draw
+    
+    Cube orders and parameters shape the ciphertext, so they come from the
+    OS CSPRNG. Callers reduce a word modulo a range of at most a few
+    hundred values, so the modulo bias is below 2**-23.
+    """
+    return np.frombuffer(secrets.token_bytes(4 * count), dtype='<u4').tolist()
+
+# Predefined safe cube orders, and the choices allowed above each remaining-characters threshold
+_SAFE_ORDERS = (3, 4, 5, 6, 7, 8, 9, 10, 12, 15, 18, 20, 25, 30, 35, 40, 45, 50)
+_SAFE_ORDER_TIERS = tuple(
+    (min_remaining, tuple(o for o in _SAFE_ORDERS if o >= min_order))
+    for min_remaining, min_order in ((10000, 20), (5000, 15), (1000, 10), (500, 8), (0, 3))
+)
+
+# Cube layout as parallel int64 arrays, one entry per cube
+CubeConfig = namedtuple("CubeConfig", "orders capacities actual_chars")
 
 class CubeEncryptUI_EN:
-    def __init__(self):
+    # cube_strategy names accepted in --config files, mapped to the interactive menu choices
+    CUBE_STRATEGIES = {"random": 1, "fixed": 2, "manual": 3, "safe": 4}
+    # Key selection methods understood by CubeUtils.selective_encrypt
+    SELECTION_METHODS = ("random", "sequential", "hash_based")
+    
+    def __init__(self, quiet=False, pretty=False):
+        # quiet discards CubeUtils' per-cube progress output; pretty indents written .cube files
+        self.quiet = quiet
+        self.pretty = pretty
         self.script_dir = os.path.dirname(os.path.abspath(__file__))
-        self.temp_dir = os.path.join(self.script_dir, "temp_cube_files")
         self.output_dir = os.path.join(self.script_dir, "cube_results")
-        self.cube_utils_path = os.path.join(self.script_dir, "CubeUtils.py")
+        
+        # CubeUtils runs in-process: imported once instead of one interpreter per chunk
+        if self.script_dir not in sys.path:
+            sys.path.insert(0, self.script_dir)
+        self._cube_mod = importlib.import_module("CubeUtils")
         
         # Create necessary directories
         self._create_directories()
     
     def _create_directories(self):
         """Create necessary directories"""
-        for directory in [self.temp_dir, self.output_dir]:
-            if not os.path.exists(directory):
-                os.makedirs(directory)
+        os.makedirs(self.output_dir, exist_ok=True)
+    
+    def _dump_cube_file(self, data):
+        """Serialize .cube file contents to UTF-8 JSON bytes"""
+        if orjson is not None:
+            return orjson.dumps(data, option=orjson.OPT_INDENT_2 if self.pretty else 0)
+        if self.pretty:
+            return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+        return json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
     
-    def _clean_temp_files(self):
-        """Clean temporary files"""
-        if os.path.exists(self.temp_dir):
-            shutil.rmtree(self.temp_dir)
-            os.makedirs(self.temp_dir)
+    def _load_cube_file(self, raw):
+        """Parse .cube file contents from raw bytes"""
+        if orjson is not None:
+            return orjson.loads(raw)
+        return json.loads(raw)
+    
+    def _read_text_file(self, path):
+        """Read a UTF-8 text file by decoding a read-only mapping of it, with universal newlines"""
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return ""
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                text = str(mm, 'utf-8')
+        
+        if '\r' in text:
+            text = text.replace('\r\n', '\n').replace('\r', '\n')
+        return text
+    
+    def _open_cube_file(self, path):
+        """
+        Open a .cube file for chunk-wise reading; returns (metadata, iter_chunks)
+        
+        iter_chunks() yields (encrypted chunk, key info or None) pairs in chunk order
+        and may be called again for another pass. With ijson only the metadata is read
+        here and every pass streams the file; otherwise the file is parsed once, here,
+        and passes walk the parsed document.
+        """
+        if ijson is None:
+            with open(path, 'rb') as f:
+                cube_data = self._load_cube_file(f.read())
+            keys = {item.get("chunk_index"): item.get("key_info") for item in cube_data.get("key_data", [])}
+            chunks = [(encrypted_chunk_info, keys.get(i))
+                      for i, encrypted_chunk_info in enumerate(cube_data.get("encrypted_data", []))]
+            return cube_data.get("metadata", {}), lambda: iter(chunks)
+        
+        with open(path, 'rb') as f:
+            metadata = next(ijson.items(f, 'metadata', use_float=True), {})
+        return metadata, lambda: self._stream_cube_chunks(path)
+    
+    def _stream_cube_chunks(self, path):
+        """Yield (encrypted chunk, key info or None) pairs from a .cube file with ijson"""
+        # Stream chunks and keys through two handles; keys are indexed only as far as needed
+        with open(path, 'rb') as chunk_f, open(path, 'rb') as key_f:
+            key_items = ijson.items(key_f, 'key_data.item', use_float=True)
+            keys = {}
+            for i, encrypted_chunk_info in enumerate(ijson.items(chunk_f, 'encrypted_data.item', use_float=True)):
+                while i not in keys:
+                    key_item = next(key_items, None)
+                    if key_item is None:
+                        break
+                    keys[key_item.get("chunk_index")] = key_item.get("key_info")
+                yield encrypted_chunk_info, keys.pop(i, None)
+    
+    def _check_cube_order(self, order):
+        """Return order if CubeUtils can encode cubes of it; raises ValueError otherwise"""
+        max_order = self._cube_mod.MAX_ORDER
+        if not 3 <= order <= max_order:
+            raise ValueError(f"Cube order must be between 3 and {max_order}, got {order}")
+        return order
+    
+    def _get_cube_order(self, prompt):
+        """Prompt until a supported cube order is entered"""
+        while True:
+            try:
+                return self._check_cube_order(self._get_user_input(prompt, "25", int))
+            except ValueError as e:
+                print(f"{e}, please try again.")
     
     def _get_user_input(self, prompt, default=None, input_type=str):
         """Get user input with validation"""
@@ -62,7 +177,10 @@ class CubeEncryptUI_EN:
             avg_chars_per_cube = 2000  # Average characters per cube
             num_cubes = max(1, math.ceil(text_length / avg_chars_per_cube))
         
-        cube_orders = []
+        isqrt = math.isqrt
+        # Two words per cube: fill ratio, then order
+        rnd = _random_words(2 * num_cubes)
+        orders = []
         remaining_chars = text_length
         
         for i in range(num_cubes):
@@ -72,15 +190,16 @@ class CubeEncryptUI_EN:
             # Dynamically calculate appropriate cube order
             # Cube capacity = order^2 * 6
             # Target fill ratio: 60%-90%
-            target_fill_ratio = random.uniform(0.6, 0.9)
+            target_fill_ratio = 0.6 + 0.3 * rnd[2 * i] / 4294967296.0
             target_capacity = max(remaining_chars, 54)  # Minimum capacity for 3x3 cube (3*3*6=54)
             target_capacity = target_capacity / target_fill_ratio
             
             # Calculate cube order: order = sqrt(capacity/6)
-            suggested_order = max(3, math.isqrt(int(target_capacity / 6)))
+            suggested_order = max(3, isqrt(int(target_capacity / 6)))
             
             # Add random variation ±30% around suggested order, but ensure min <= max
-            min_order = max(3, int(suggested_order * 0.7))
+            # Cap the low end too, or very long texts push both ends past 50
+            min_order = min(50, max(3, int(suggested_order * 0.7)))
             max_order = min(50, int(suggested_order * 1.3))  # Maximum 50th order
             
             # Ensure min_order is not greater than max_order
@@ -90,136 +209,152 @@ class CubeEncryptUI_EN:
             min_order = max(3, min_order)
             max_order = max(min_order, max_order)
             
-            cube_order = random.randint(min_order, max_order)
-            cube_capacity = cube_order * cube_order * 6
-            
-            # Actual characters for this cube
-            chars_for_this_cube = min(remaining_chars, cube_capacity)
-            remaining_chars -= chars_for_this_cube
-            
-            cube_orders.append({
-                'order': cube_order,
-                'capacity': cube_capacity,
-                'actual_chars': chars_for_this_cube,
-                'fill_ratio': chars_for_this_cube / cube_capacity if cube_capacity > 0 else 0
-            })
-            
-            print(f"  Generated cube {i+1}: order={cube_order}, capacity={cube_capacity}, "
-                  f"chars={chars_for_this_cube}, fill_rate={cube_orders[-1]['fill_ratio']:.1%}")
+            cube_order = min_order + rnd[2 * i + 1] % (max_order - min_order + 1)
+            orders.append(cube_order)
+            remaining_chars -= cube_order * cube_order * 6
+        
+        cube_orders = self._build_cube_orders(orders, text_length)
+        for i, (order, capacity, chars) in enumerate(zip(*(a.tolist() for a in cube_orders))):
+            print(f"  Generated cube {i+1}: order={order}, capacity={capacity}, "
+                  f"chars={chars}, fill_rate={chars / capacity:.1%}")
         
         return cube_orders
     
-    def _preprocess_string_variable_cubes(self, text, cube_orders):
-        """Preprocess string and split according to different cube sizes"""
-        chunks = []
+    def _build_cube_orders(self, orders, text_length):
+        """Fill cubes of the given orders in sequence, computing all capacities in one vectorized pass"""
+        orders = np.asarray(orders, dtype=np.int64)
+        capacities = orders * orders * 6
+        # Characters placed so far after each cube, capped at the text length
+        filled = np.minimum(np.cumsum(capacities), text_length)
+        actual_chars = np.diff(filled, prepend=0)
+        
+        return CubeConfig(orders, capacities, actual_chars)
+    
+    def _iter_chunks(self, text, cube_orders):
+        """Yield (cube order, string segment) per cube, slicing each segment only as it is consumed"""
         current_pos = 0
         
-        for i, cube_info in enumerate(cube_orders):
-            cube_order = cube_info['order']
-            capacity = cube_info['capacity']
-            actual_chars = cube_info['actual_chars']
-            
-            # Extract string segment for this cube
-            chunk = text[current_pos:current_pos + actual_chars]
-            current_pos += actual_chars
-            
+        for cube_order, actual_chars in zip(cube_orders.orders.tolist(), cube_orders.actual_chars.tolist()):
             # If string length is insufficient, leave empty spaces (handled by program)
-            chunks.append({
-                'text': chunk,
-                'order': cube_order,
-                'capacity': capacity,
-                'actual_length': len(chunk)
-            })
+            yield cube_order, text[current_pos:current_pos + actual_chars]
+            current_pos += actual_chars
             
             if current_pos >= len(text):
                 break
-        
-        return chunks
     
-    def _preprocess_string_fixed_cube(self, text, cube_order):
-        """Preprocess string using fixed cube size"""
-        chunk_size = cube_order * cube_order * 6
-        chunks = []
-        
-        for i in range(0, len(text), chunk_size):
-            chunk = text[i:i+chunk_size]
-            chunks.append({
-                'text': chunk,
-                'order': cube_order,
-                'capacity': chunk_size,
-                'actual_length': len(chunk)
-            })
-        
-        return chunks
+    def _count_chunks(self, text_length, cube_orders):
+        """Number of segments _iter_chunks yields: cubes up to the one that reaches the end of the text"""
+        filled = np.cumsum(cube_orders.actual_chars)
+        return min(len(filled), int(np.searchsorted(filled, text_length)) + 1)
     
     def _generate_safe_cube_orders(self, text_length, num_cubes=None):
         """Safe fallback method for generating cube orders"""
         if num_cubes is None:
             num_cubes = max(1, math.ceil(text_length / 2000))
         
-        cube_orders = []
+        rnd = _random_words(num_cubes)
+        orders = []
         remaining_chars = text_length
         
-        # Predefined safe order ranges
-        safe_orders = [3, 4, 5, 6, 7, 8, 9, 10, 12, 15, 18, 20, 25, 30, 35, 40, 45, 50]
-        
         for i in range(num_cubes):
             if remaining_chars <= 0:
                 break
             
             # Choose an appropriate order based on remaining characters
-            if remaining_chars > 10000:
-                order = random.choice([o for o in safe_orders if o >= 20])
-            elif remaining_chars > 5000:
-                order = random.choice([o for o in safe_orders if o >= 15])
-            elif remaining_chars > 1000:
-                order = random.choice([o for o in safe_orders if o >= 10])
-            elif remaining_chars > 500:
-                order = random.choice([o for o in safe_orders if o >= 8])
-            else:
-                order = random.choice([o for o in safe_orders if o >= 3])
-            
-            capacity = order * order * 6
-            chars_for_this_cube = min(remaining_chars, capacity)
-            remaining_chars -= chars_for_this_cube
+            for min_remaining, choices in _SAFE_ORDER_TIERS:
+                if remaining_chars > min_remaining:
+                    order = choices[rnd[i] % len(choices)]
+                    break
             
-            cube_orders.append({
-                'order': order,
-                'capacity': capacity,
-                'actual_chars': chars_for_this_cube,
-                'fill_ratio': chars_for_this_cube / capacity if capacity > 0 else 0
-            })
+            orders.append(order)
+            remaining_chars -= order * order * 6
         
-        return cube_orders
+        return self._build_cube_orders(orders, text_length)
     
     def _generate_random_parameters(self):
         """Generate cryptographically random parameters"""
+        moves_word, multiplier_word = _random_words(2)
+        
         # Number of moves: random between 50-500
-        num_moves = random.randint(50, 500)
+        num_moves = 50 + moves_word % 451
         
         # Key pool multiplier: random between 3-10
-        key_pool_multiplier = random.randint(3, 10)
+        key_pool_multiplier = 3 + multiplier_word % 8
         
         return num_moves, key_pool_multiplier
     
-    def _run_cube_utils(self, args):
-        """Execute CubeUtils.py program"""
+    def _run_cube_utils(self, operation, *args):
+        """Call a CubeUtils entry point in-process; returns its result, or None on failure"""
         try:
-            cmd = [sys.executable, self.cube_utils_path] + args
-            result = subprocess.run(cmd, capture_output=True, text=True, cwd=self.script_dir)
-            
-            if result.returncode != 0:
-                print(f"Execution error: {result.stderr}")
-                return False
-            
-            print(result.stdout)
-            return True
+            if not self.quiet:
+                return getattr(self._cube_mod, operation)(*args)
+            with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                return getattr(self._cube_mod, operation)(*args)
         except Exception as e:
             print(f"Error executing program: {e}")
-            return False
+            return None
     
     def encrypt_ui(self):
         """Encryption user interface"""
+        params = self._collect_encrypt_params_interactive()
+        if params is not None:
+            self._do_encrypt(params)
+    
+    def _make_cube_orders(self, size_choice, text_length, orders=None):
+        """Build the CubeConfig for a size strategy; orders are the user's fixed or manual cube orders"""
+        if size_choice == 1:
+            # Cryptographic random sizes
+            print("\nGenerating random cube sizes...")
+            try:
+                return self._generate_random_cube_orders(text_length)
+            except Exception as e:
+                print(f"Error generating random cube sizes: {e}")
+                print("Falling back to safe cube size generation...")
+                return self._generate_safe_cube_orders(text_length)
+            
+        elif size_choice == 2:
+            # Fixed size
+            cube_order = orders[0]
+            # Generate fixed-size cube list
+            chunk_size = cube_order * cube_order * 6
+            num_cubes = math.ceil(text_length / chunk_size)
+            return self._build_cube_orders([cube_order] * num_cubes, text_length)
+                
+        elif size_choice == 3:
+            # Manual specification
+            num_cubes = len(orders)
+            orders = np.array(orders, dtype=np.int64)
+            capacities = orders * orders * 6
+            # Distribute characters evenly
+            avg_chars = text_length // num_cubes
+            actual_chars = np.full(num_cubes, avg_chars, dtype=np.int64)
+            actual_chars[-1:] = text_length - (avg_chars * (num_cubes - 1))  # Last cube gets remaining characters
+            return CubeConfig(orders, capacities, np.minimum(actual_chars, capacities))
+        
+        elif size_choice == 4:
+            # Safe random sizes
+            print("\nGenerating safe random cube sizes...")
+            return self._generate_safe_cube_orders(text_length)
+        
+        return CubeConfig(*(np.empty(0, dtype=np.int64) for _ in CubeConfig._fields))
+    
+    def _show_cube_config(self, cube_orders):
+        """Print the cube configuration; returns the number of characters it will encrypt"""
+        print(f"\nCube Configuration:")
+        total_capacity = 0
+        total_actual = 0
+        for i, (order, capacity, chars) in enumerate(zip(*(a.tolist() for a in cube_orders))):
+            print(f"  Cube {i+1}: Order={order}, Capacity={capacity}, "
+                  f"Actual Chars={chars}, Fill Rate={chars / capacity:.1%}")
+            total_capacity += capacity
+            total_actual += chars
+        
+        print(f"  Total: {len(cube_orders.orders)} cubes, Total Capacity={total_capacity}, "
+              f"Total Characters={total_actual}, Overall Fill Rate={total_actual/total_capacity:.1%}")
+        return total_actual
+    
+    def _collect_encrypt_params_interactive(self):
+        """Prompt for the text and encryption parameters; returns a params dict, or None if aborted"""
         print("\n" + "="*50)
         print("Cube Encryption Tool - Variable Cube Size Support")
         print("="*50)
@@ -235,15 +370,14 @@ class CubeEncryptUI_EN:
         else:
             file_path = self._get_user_input("Please enter file path")
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    text = f.read()
+                text = self._read_text_file(file_path)
             except Exception as e:
                 print(f"Failed to read file: {e}")
-                return
+                return None
         
         if not text:
             print("Input text is empty, cannot encrypt.")
-            return
+            return None
         
         text_length = len(text)
         print(f"\nInput text length: {text_length} characters")
@@ -256,77 +390,25 @@ class CubeEncryptUI_EN:
         print("4. Safe random sizes - Uses predefined safe orders")
         size_choice = self._get_user_input("Please choose (1/2/3/4)", "4", int)
         
-        cube_orders = []
-        
-        if size_choice == 1:
-            # Cryptographic random sizes
-            print("\nGenerating random cube sizes...")
-            try:
-                cube_orders = self._generate_random_cube_orders(text_length)
-            except Exception as e:
-                print(f"Error generating random cube sizes: {e}")
-                print("Falling back to safe cube size generation...")
-                cube_orders = self._generate_safe_cube_orders(text_length)
-            
-        elif size_choice == 2:
-            # Fixed size
-            cube_order = self._get_user_input("Please enter cube order", "25", int)
-            # Generate fixed-size cube list
-            chunk_size = cube_order * cube_order * 6
-            num_cubes = math.ceil(text_length / chunk_size)
-            for i in range(num_cubes):
-                actual_chars = min(chunk_size, text_length - i * chunk_size)
-                cube_orders.append({
-                    'order': cube_order,
-                    'capacity': chunk_size,
-                    'actual_chars': actual_chars,
-                    'fill_ratio': actual_chars / chunk_size
-                })
-                
+        orders = None
+        if size_choice == 2:
+            orders = [self._get_cube_order("Please enter cube order")]
         elif size_choice == 3:
-            # Manual specification
             num_cubes = self._get_user_input("How many cubes are needed", "1", int)
-            for i in range(num_cubes):
-                order = self._get_user_input(f"Please enter order for cube {i+1}", "25", int)
-                capacity = order * order * 6
-                # Distribute characters evenly
-                avg_chars = text_length // num_cubes
-                if i == num_cubes - 1:  # Last cube gets remaining characters
-                    actual_chars = text_length - (avg_chars * (num_cubes - 1))
-                else:
-                    actual_chars = avg_chars
-                
-                cube_orders.append({
-                    'order': order,
-                    'capacity': capacity,
-                    'actual_chars': min(actual_chars, capacity),
-                    'fill_ratio': min(actual_chars, capacity) / capacity
-                })
+            orders = [self._get_cube_order(f"Please enter order for cube {i+1}")
+                      for i in range(num_cubes)]
         
-        elif size_choice == 4:
-            # Safe random sizes
-            print("\nGenerating safe random cube sizes...")
-            cube_orders = self._generate_safe_cube_orders(text_length)
+        cube_orders = self._make_cube_orders(size_choice, text_length, orders)
         
         # Display cube configuration
-        print(f"\nCube Configuration:")
-        total_capacity = 0
-        total_actual = 0
-        for i, cube_info in enumerate(cube_orders):
-            print(f"  Cube {i+1}: Order={cube_info['order']}, Capacity={cube_info['capacity']}, "
-                  f"Actual Chars={cube_info['actual_chars']}, Fill Rate={cube_info['fill_ratio']:.1%}")
-            total_capacity += cube_info['capacity']
-            total_actual += cube_info['actual_chars']
-        
-        print(f"  Total: {len(cube_orders)} cubes, Total Capacity={total_capacity}, "
-              f"Total Characters={total_actual}, Overall Fill Rate={total_actual/total_capacity:.1%}")
+        total_actual = self._show_cube_config(cube_orders)
         
         # Verify we can handle all text
         if total_actual < text_length:
             print(f"Warning: Only {total_actual} out of {text_length} characters will be encrypted!")
             proceed = self._get_user_input("Continue anyway? (y/n)", "y")
             if proceed.lower() != 'y':
-                return
+                return None
         
         # Other parameter selection
         print("\nSelect other encryption parameters:")
@@ -352,71 +434,113 @@ class CubeEncryptUI_EN:
         selection_choice = self._get_user_input("Please choose (1/2/3)", "1")
         selection_method = selection_methods.get(selection_choice, "random")
         
-        # Preprocess string
-        print("\nPreprocessing string...")
-        if size_choice == 1 or size_choice == 3 or size_choice == 4:
-            chunks = self._preprocess_string_variable_cubes(text, cube_orders)
+        return {
+            'text': text,
+            'size_choice': size_choice,
+            'cube_orders': cube_orders,
+            'num_moves': num_moves,
+            'key_pool_multiplier': key_pool_multiplier,
+            'selection_method': selection_method
+        }
+    
+    def _collect_encrypt_params_from_json(self, config):
+        """Build encryption params from a config dict without prompting; raises ValueError on bad config"""
+        if 'text' in config:
+            text = config['text']
         else:
-            chunks = self._preprocess_string_fixed_cube(text, cube_orders[0]['order'])
+            text = self._read_text_file(config['text_file'])
+        
+        if not text:
+            raise ValueError("Input text is empty, cannot encrypt")
+        
+        text_length = len(text)
+        print(f"\nInput text length: {text_length} characters")
         
-        print(f"String split into {len(chunks)} cube chunks")
+        strategy = config.get('cube_strategy', 'safe')
+        if strategy not in self.CUBE_STRATEGIES:
+            raise ValueError(f"Unknown cube_strategy '{strategy}', expected one of {list(self.CUBE_STRATEGIES)}")
+        size_choice = self.CUBE_STRATEGIES[strategy]
         
-        # Clean temporary directory
-        self._clean_temp_files()
+        orders = None
+        if size_choice == 2:
+            orders = [self._check_cube_order(int(config.get('cube_order', 25)))]
+        elif size_choice == 3:
+            orders = [self._check_cube_order(int(order)) for order in config['cube_orders']]
+            if not orders:
+                raise ValueError("cube_orders must list at least one cube order")
         
-        # Create temporary files and encrypt each chunk
+        cube_orders = self._make_cube_orders(size_choice, text_length, orders)
+        total_actual = self._show_cube_config(cube_orders)
+        if total_actual < text_length:
+            print(f"Warning: Only {total_actual} out of {text_length} characters will be encrypted!")
+        
+        num_moves, key_pool_multiplier = self._generate_random_parameters()
+        num_moves = int(config.get('num_moves', num_moves))
+        key_pool_multiplier = int(config.get('key_pool_multiplier', key_pool_multiplier))
+        if num_moves < 1 or key_pool_multiplier < 1:
+            raise ValueError("num_moves and key_pool_multiplier must be positive")
+        
+        selection_method = config.get('selection_method', "random")
+        if selection_method not in self.SELECTION_METHODS:
+            raise ValueError(f"Unknown selection_method '{selection_method}', expected one of {list(self.SELECTION_METHODS)}")
+        
+        return {
+            'text': text,
+            'size_choice': size_choice,
+            'cube_orders': cube_orders,
+            'num_moves': num_moves,
+            'key_pool_multiplier': key_pool_multiplier,
+            'selection_method': selection_method
+        }
+    
+    def _do_encrypt(self, params):
+        """Encrypt params['text'] chunk by chunk and write the .cube file; returns its path, or None on failure"""
+        text = params['text']
+        text_length = len(text)
+        size_choice = params['size_choice']
+        cube_orders = params['cube_orders']
+        num_chunks = self._count_chunks(text_length, cube_orders)
+        num_moves = params['num_moves']
+        key_pool_multiplier = params['key_pool_multiplier']
+        selection_method = params['selection_method']
+        
+        # Segments are sliced lazily, one at a time, as the encrypt loop consumes them;
+        # fixed-size layouts are already expanded to one entry per cube by _make_cube_orders
+        print(f"\nString split into {num_chunks} cube chunks")
+        
+        # Encrypt each chunk
         encrypted_chunks = []
-        key_files = []
+        chunk_keys = []  # key_data entries of the .cube file, in chunk order
         
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        timestamp = time.strftime("%Y%m%d_%H%M%S")
         
-        for i, chunk_info in enumerate(chunks):
-            chunk = chunk_info['text']
-            cube_order = chunk_info['order']
-            
-            print(f"\nProcessing cube chunk {i+1}/{len(chunks)}...")
+        for i, (cube_order, chunk) in enumerate(self._iter_chunks(text, cube_orders)):
+            print(f"\nProcessing cube chunk {i+1}/{num_chunks}...")
             print(f"  Cube order: {cube_order}, Characters: {len(chunk)}")
             
-            # Create temporary input file
-            input_file = os.path.join(self.temp_dir, f"chunk_{i}_input.txt")
-            with open(input_file, 'w', encoding='utf-8') as f:
-                f.write(chunk)
-            
-            # Create temporary output file
-            output_file = os.path.join(self.temp_dir, f"chunk_{i}_encrypted.txt")
-            
-            # Create temporary key file
-            key_file = os.path.join(self.temp_dir, f"chunk_{i}_key.json")
-            
-            # Build arguments
-            args = [
-                "-mode", "encrypt",
-                "-f", input_file,
-                "-k", key_file,
-                "-l", str(cube_order),
-                "-o", output_file,
-                "-n", str(num_moves),
-                "--key_pool_size", str(key_pool_multiplier),
-                "--selection", selection_method
-            ]
-            
             # Execute encryption
-            if self._run_cube_utils(args):
-                # Read encryption result
-                with open(output_file, 'r', encoding='utf-8') as f:
-                    encrypted_text = f.read().strip()
+            result = self._run_cube_utils("encrypt_text", chunk, cube_order, num_moves,
+                                          key_pool_multiplier, selection_method)
+            if result is not None:
+                encrypted_text, key_data = result
                 
                 encrypted_chunks.append({
                     'encrypted_text': encrypted_text,
                     'cube_order': cube_order,
                     'original_length': len(chunk)
                 })
-                key_files.append(key_file)
+                # Only the key seed goes into the .cube file; decryption re-expands
+                # the pool for the chunk's cube order
+                chunk_keys.append({
+                    "chunk_index": i,
+                    "cube_order": cube_order,
+                    "key_info": self._cube_mod.key_data_header(key_data)
+                })
                 
                 print(f"Cube chunk {i+1} encrypted successfully")
             else:
                 print(f"Cube chunk {i+1} encryption failed")
-                return
+                return None
         
         # Merge encryption results and keys
         print("\nMerging encryption results...")
@@ -435,34 +559,23 @@ class CubeEncryptUI_EN:
                 "cube_strategy": "variable" if size_choice in [1, 4] else "fixed"
             },
             "encrypted_data": encrypted_chunks,
-            "key_data": []
+            "key_data": chunk_keys
         }
         
-        # Merge key data
-        for i, key_file in enumerate(key_files):
-            with open(key_file, 'r', encoding='utf-8') as f:
-                key_data = json.load(f)
-            
-            final_output["key_data"].append({
-                "chunk_index": i,
-                "cube_order": encrypted_chunks[i]['cube_order'],
-                "key_info": key_data
-            })
-        
         # Save final file
         final_filename = f"encrypted_result_{timestamp}.cube"
         final_filepath = os.path.join(self.output_dir, final_filename)
         
-        with open(final_filepath, 'w', encoding='utf-8') as f:
-            json.dump(final_output, f, indent=2, ensure_ascii=False)
-        
-        # Clean temporary files
-        self._clean_temp_files()
+        # Serialize once and hand the file a single pre-encoded buffer
+        cube_file_data = self._dump_cube_file(final_output)
+        with open(final_filepath, 'wb') as f:
+            f.write(cube_file_data)
         
         print(f"\nEncryption completed!")
         print(f"Final file: {final_filepath}")
         print(f"Total cubes encrypted: {len(encrypted_chunks)}")
         print(f"Cube orders used: {[chunk['cube_order'] for chunk in encrypted_chunks]}")
+        return final_filepath
     
     def decrypt_ui(self):
         """Decryption user interface"""
@@ -472,16 +585,17 @@ class CubeEncryptUI_EN:
         
         # Get encrypted file
         encrypted_file = self._get_user_input("Please enter encrypted file path (.cube file)")
-        
+        self._do_decrypt(encrypted_file)
+    
+    def _do_decrypt(self, encrypted_file):
+        """Decrypt a .cube file and write the text result; returns its path, or None on failure"""
         try:
-            with open(encrypted_file, 'r', encoding='utf-8') as f:
-                encrypted_data = json.load(f)
+            metadata, iter_chunks = self._open_cube_file(encrypted_file)
         except Exception as e:
             print(f"Failed to read encrypted file: {e}")
-            return
+            return None
         
         # Display file information
-        metadata = encrypted_data.get("metadata", {})
         print(f"\nFile Information:")
         print(f"  Timestamp: {metadata.get('timestamp', 'Unknown')}")
         print(f"  Original text length: {metadata.get('original_text_length', 'Unknown')}")
@@ -492,65 +606,27 @@ class CubeEncryptUI_EN:
         print(f"  Number of moves: {enc_params.get('num_moves', 'Unknown')}")
         print(f"  Key selection: {enc_params.get('selection_method', 'Unknown')}")
         
-        # Clean temporary directory
-        self._clean_temp_files()
-        
         # Decrypt each chunk
         decrypted_chunks = []
-        encrypted_chunks = encrypted_data.get("encrypted_data", [])
-        key_data_list = encrypted_data.get("key_data", [])
+        total_chunks = metadata.get('total_chunks', 0)
         
-        print(f"\nStarting decryption of {len(encrypted_chunks)} cube chunks...")
+        print(f"\nStarting decryption of {total_chunks} cube chunks...")
         
-        for i, encrypted_chunk_info in enumerate(encrypted_chunks):
+        for i, (encrypted_chunk_info, chunk_key_data) in enumerate(iter_chunks()):
             encrypted_chunk = encrypted_chunk_info['encrypted_text']
             cube_order = encrypted_chunk_info['cube_order']
             original_length = encrypted_chunk_info['original_length']
             
-            print(f"Decrypting cube chunk {i+1}/{len(encrypted_chunks)}...")
+            print(f"Decrypting cube chunk {i+1}/{total_chunks}...")
             print(f"  Cube order: {cube_order}, Original characters: {original_length}")
             
-            # Create temporary encrypted file
-            encrypted_file_temp = os.path.join(self.temp_dir, f"chunk_{i}_encrypted.txt")
-            with open(encrypted_file_temp, 'w', encoding='utf-8') as f:
-                f.write(encrypted_chunk)
-            
-            # Create temporary key file
-            key_file_temp = os.path.join(self.temp_dir, f"chunk_{i}_key.json")
-            chunk_key_data = None
-            
-            # Find corresponding key data
-            for key_item in key_data_list:
-                if key_item.get("chunk_index") == i:
-                    chunk_key_data = key_item.get("key_info")
-                    break
-            
             if not chunk_key_data:
                 print(f"Warning: No key data found for cube chunk {i}")
                 continue
             
-            # Save key file
-            with open(key_file_temp, 'w', encoding='utf-8') as f:
-                json.dump(chunk_key_data, f, indent=2, ensure_ascii=False)
-            
-            # Create temporary output file
-            decrypted_file_temp = os.path.join(self.temp_dir, f"chunk_{i}_decrypted.txt")
-            
-            # Build decryption arguments
-            args = [
-                "-mode", "decrypt",
-                "-f", encrypted_file_temp,
-                "-k", key_file_temp,
-                "-l", str(cube_order),
-                "-o", decrypted_file_temp
-            ]
-            
             # Execute decryption
-            if self._run_cube_utils(args):
-                # Read decryption result
-                with open(decrypted_file_temp, 'r', encoding='utf-8') as f:
-                    decrypted_text = f.read().strip()
-                
+            decrypted_text = self._run_cube_utils("decrypt_text", encrypted_chunk, chunk_key_data, cube_order)
+            if decrypted_text is not None:
                 # Truncate based on original length (handle possible padding)
                 if original_length < len(decrypted_text):
                     decrypted_text = decrypted_text[:original_length]
@@ -564,21 +640,19 @@ class CubeEncryptUI_EN:
         final_decrypted_text = ''.join(decrypted_chunks)
         
         # Save decryption result
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        timestamp = time.strftime("%Y%m%d_%H%M%S")
         output_filename = f"decrypted_result_{timestamp}.txt"
         output_filepath = os.path.join(self.output_dir, output_filename)
         
-        with open(output_filepath, 'w', encoding='utf-8') as f:
-            f.write(final_decrypted_text)
-        
-        # Clean temporary files
-        self._clean_temp_files()
+        with open(output_filepath, 'wb') as f:
+            f.write(final_decrypted_text.encode('utf-8'))
         
         print(f"\nDecryption completed!")
         print(f"Decryption result: {output_filepath}")
         print(f"Decrypted text length: {len(final_decrypted_text)} characters")
         print(f"\nDecrypted content preview (first 500 characters):")
         print(final_decrypted_text[:500] + ("..." if len(final_decrypted_text) > 500 else ""))
+        return output_filepath
     
     def brute_force_ui(self):
         """Brute force user interface"""
@@ -592,80 +666,96 @@ class CubeEncryptUI_EN:
         # Get input
         encrypted_file = self._get_user_input("Please enter encrypted file path (.cube file)")
         
+        layout = self._show_chunk_layout(encrypted_file)
+        if layout is None:
+            return
+        
+        max_attempts = self._get_user_input("Please enter maximum attempts", "10", int)
+        self._do_brute_force(*layout, max_attempts)
+    
+    def _show_chunk_layout(self, encrypted_file):
+        """Print each chunk's order and length; returns (iter_chunks, chunk count), or None if unreadable"""
         try:
-            with open(encrypted_file, 'r', encoding='utf-8') as f:
-                encrypted_data = json.load(f)
+            _, iter_chunks = self._open_cube_file(encrypted_file)
+            # Only orders and lengths are kept for display; chunks are read again when attacked
+            chunk_layout = [(chunk['cube_order'], chunk['original_length'])
+                            for chunk, _ in iter_chunks()]
         except Exception as e:
             print(f"Failed to read encrypted file: {e}")
-            return
+            return None
         
         # Display cube information
-        encrypted_chunks = encrypted_data.get("encrypted_data", [])
-        print(f"File contains {len(encrypted_chunks)} cube chunks")
-        
-        for i, chunk in enumerate(encrypted_chunks):
-            print(f"Cube {i+1}: Order={chunk['cube_order']}, Original Length={chunk['original_length']}")
-        
-        max_attempts = self._get_user_input("Please enter maximum attempts", "10", int)
+        print(f"File contains {len(chunk_layout)} cube chunks")
         
-        # Clean temporary directory
-        self._clean_temp_files()
+        for i, (cube_order, original_length) in enumerate(chunk_layout):
+            print(f"Cube {i+1}: Order={cube_order}, Original Length={original_length}")
         
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        return iter_chunks, len(chunk_layout)
+    
+    def _do_brute_force(self, iter_chunks, num_chunks, max_attempts):
+        """Brute force every chunk from iter_chunks (see _open_cube_file); returns the results directory"""
+        timestamp = time.strftime("%Y%m%d_%H%M%S")
         results_dir = os.path.join(self.output_dir, f"bruteforce_results_{timestamp}")
+        chunk_dir_prefix = os.path.join(results_dir, "chunk_")
         
         # Perform brute force on each cube individually
-        key_data_list = encrypted_data.get("key_data", [])
-        
-        for i, encrypted_chunk_info in enumerate(encrypted_chunks):
-            print(f"\nBrute forcing cube chunk {i+1}/{len(encrypted_chunks)}...")
+        for i, (encrypted_chunk_info, chunk_key_data) in enumerate(iter_chunks()):
+            print(f"\nBrute forcing cube chunk {i+1}/{num_chunks}...")
             
             encrypted_chunk = encrypted_chunk_info['encrypted_text']
             cube_order = encrypted_chunk_info['cube_order']
             
-            # Create temporary encrypted file
-            temp_encrypted = os.path.join(self.temp_dir, f"chunk_{i}_encrypted.txt")
-            with open(temp_encrypted, 'w', encoding='utf-8') as f:
-                f.write(encrypted_chunk)
-            
-            # Find corresponding key file
-            key_file = None
-            for key_item in key_data_list:
-                if key_item.get("chunk_index") == i:
-                    # Create temporary key file
-                    key_file_temp = os.path.join(self.temp_dir, f"chunk_{i}_key.json")
-                    with open(key_file_temp, 'w', encoding='utf-8') as f:
-                        json.dump(key_item.get("key_info"), f, indent=2)
-                    key_file = key_file_temp
-                    break
-            
-            if not key_file:
+            if not chunk_key_data:
                 print(f"Warning: No key file found for cube chunk {i}, skipping")
                 continue
             
-            # Build arguments
-            chunk_results_dir = os.path.join(results_dir, f"chunk_{i}")
-            
-            args = [
-                "-mode", "bruteforce",
-                "-f", temp_encrypted,
-                "-k", key_file,
-                "-l", str(cube_order),
-                "--max_attempts", str(max_attempts),
-                "--results_dir", chunk_results_dir
-            ]
+            chunk_results_dir = f"{chunk_dir_prefix}{i}"
             
             # Execute brute force
-            if self._run_cube_utils(args):
+            summary = self._run_cube_utils("bruteforce_text", encrypted_chunk, chunk_key_data, cube_order,
+                                           max_attempts, chunk_results_dir)
+            if summary is not None:
+                for item in summary:
+                    print(f"  Cube {item['cube_index']}: score={item['best_score']:.3f}, key={item['best_key']}")
                 print(f"Cube chunk {i+1} brute force completed")
             else:
                 print(f"Cube chunk {i+1} brute force failed")
         
-        # Clean temporary files
-        self._clean_temp_files()
-        
         print(f"\nBrute force completed!")
         print(f"Results saved to: {results_dir}")
+        return results_dir
+    
+    def run_config(self, config_path):
+        """Run one operation described by a JSON config file, without prompting.
+        
+        The config holds "operation" ("encrypt", "decrypt" or "bruteforce") and its inputs:
+        encrypt takes "text" or "text_file", "cube_strategy" (random/fixed/manual/safe),
+        "cube_order" or "cube_orders", and optional "num_moves", "key_pool_multiplier",
+        "selection_method" (random parameters are drawn for any left out); decrypt and
+        bruteforce take "cube_file", bruteforce also "max_attempts".
+        
+        Returns the output path, or None on failure.
+        """
+        try:
+            with open(config_path, 'rb') as f:
+                config = json.loads(f.read())
+            if not isinstance(config, dict):
+                raise ValueError("config must be a JSON object")
+            
+            operation = config.get('operation', 'encrypt')
+            if operation == 'encrypt':
+                return self._do_encrypt(self._collect_encrypt_params_from_json(config))
+            if operation == 'decrypt':
+                return self._do_decrypt(config['cube_file'])
+            if operation == 'bruteforce':
+                layout = self._show_chunk_layout(config['cube_file'])
+                if layout is None:
+                    return None
+                return self._do_brute_force(*layout, int(config.get('max_attempts', 10)))
+            raise ValueError(f"Unknown operation '{operation}'")
+        except (OSError, KeyError, ValueError) as e:
+            print(f"Invalid config {config_path}: {e}")
+            return None
     
     def main_menu(self):
         """Main menu interface"""
@@ -694,5 +784,13 @@ class CubeEncryptUI_EN:
                 print("Invalid selection, please try again.")
 
 if __name__ == "__main__":
-    ui = CubeEncryptUI_EN()
+    parser = argparse.ArgumentParser(description="Cube Encryption & Decryption Tool")
+    parser.add_argument("--config", help="JSON config file describing one operation to run without prompts")
+    parser.add_argument("--quiet", action="store_true", help="Suppress CubeUtils' per-cube progress output")
+    parser.add_argument("--pretty", action="store_true", help="Indent written .cube files for reading (default: compact)")
+    args = parser.parse_args()
+    
+    ui = CubeEncryptUI_EN(quiet=args.quiet, pretty=args.pretty)
+    if args.config:
+        sys.exit(0 if ui.run_config(args.config) else 1)
     ui.main_menu()
\ No newline at end of file
@@ -0,0 +1,125 @@
+# encoding:utf-8
+"""
+Compiled move kernels for CubeUtils.
+
+Numba kernels that run whole move-code sequences on (6, n, n) face arrays.
+They mirror Cube.rotate_LR / Cube.rotate_UD exactly; without Numba the
+decorators are no-ops and CubeUtils uses its NumPy gather tables instead.
+"""
+
+try:
+    from numba import njit, prange
+    HAS_NUMBA = True
+except ImportError:
+    # Numba is optional: without it CubeUtils chains NumPy gather tables
+    HAS_NUMBA = False
+
+    def njit(*args, **kwargs):
+        """Stand-in for numba.njit that returns the function unchanged"""
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+    prange = range
+
+
+@njit(cache=True, boundscheck=False)
+def _rotate_face_nb(faces, face_idx, direction):
+    """Rotate one face a quarter turn in place, cycling four cells at a time"""
+    n = faces.shape[1]
+    f = faces[face_idx]
+    for i in range(n // 2):
+        for j in range(i, n-1-i):
+            t = f[i, j]
+            if direction == 1:
+                f[i, j] = f[n-1-j, i]
+                f[n-1-j, i] = f[n-1-i, n-1-j]
+                f[n-1-i, n-1-j] = f[j, n-1-i]
+                f[j, n-1-i] = t
+            else:
+                f[i, j] = f[j, n-1-i]
+                f[j, n-1-i] = f[n-1-i, n-1-j]
+                f[n-1-i, n-1-j] = f[n-1-j, i]
+                f[n-1-j, i] = t
+
+
+@njit(cache=True, boundscheck=False)
+def _rotate_LR_nb(faces, which, direction):
+    n = faces.shape[1]
+    back = n - 1 - which
+    temp = faces[0, :, which].copy()
+    if direction == 1:
+        for r in range(n):
+            faces[0, r, which] = faces[3, n-1-r, back]
+        for r in range(n):
+            faces[3, n-1-r, back] = faces[2, r, back]
+        for r in range(n):
+            faces[2, r, back] = faces[1, n-1-r, which]
+        for r in range(n):
+            faces[1, r, which] = temp[r]
+    else:
+        for r in range(n):
+            faces[0, r, which] = faces[1, r, which]
+        for r in range(n):
+            faces[1, r, which] = faces[2, n-1-r, back]
+        for r in range(n):
+            faces[2, n-1-r, back] = faces[3, r, back]
+        for r in range(n):
+            faces[3, r, back] = temp[n-1-r]
+    if which == 0:
+        _rotate_face_nb(faces, 4, direction)
+    elif which == n-1:
+        _rotate_face_nb(faces, 5, direction)
+
+
+@njit(cache=True, boundscheck=False)
+def _rotate_UD_nb(faces, which, direction):
+    n = faces.shape[1]
+    temp = faces[0, which].copy()
+    if direction == 1:
+        for c in range(n):
+            faces[0, which, c] = faces[5, which, c]
+        for c in range(n):
+            faces[5, which, c] = faces[2, which, c]
+        for c in range(n):
+            faces[2, which, c] = faces[4, which, c]
+        for c in range(n):
+            faces[4, which, c] = temp[c]
+    else:
+        for c in range(n):
+            faces[0, which, c] = faces[4, which, c]
+        for c in range(n):
+            faces[4, which, c] = faces[2, which, c]
+        for c in range(n):
+            faces[2, which, c] = faces[5, which, c]
+        for c in range(n):
+            faces[5, which, c] = temp[c]
+    if which == 0:
+        _rotate_face_nb(faces, 1, direction)
+    elif which == n-1:
+        _rotate_face_nb(faces, 3, direction)
+
+
+@njit(cache=True, boundscheck=False)
+def apply_moves_nb(faces, codes):
+    """
+    Compiled move loop over packed move codes; mirrors Cube.rotate_LR / rotate_UD
+    
+    Every code must address a layer of this cube (code < 4 * n); callers
+    filter out the no-op codes first.
+    """
+    for i in range(codes.shape[0]):
+        code = codes[i]
+        which = code >> 2
+        direction = -1 if code & 1 else 1
+        if code & 2:
+            _rotate_UD_nb(faces, which, direction)
+        else:
+            _rotate_LR_nb(faces, which, direction)
+
+
+@njit(cache=True, parallel=True, boundscheck=False)
+def apply_moves_batch_nb(all_faces, codes, offsets):
+    """Run each slice codes[offsets[c]:offsets[c+1]] on all_faces[c], one thread per entry"""
+    for c in prange(all_faces.shape[0]):
+        apply_moves_nb(all_faces[c], codes[offsets[c]:offsets[c+1]])
@@ -0,0 +1,120 @@
+# encoding:utf-8
+"""
+Round-trip tests for CubeUtils key files: the binary format with and
+without a key seed, the JSON layout of move names, and move-table checks.
+
+Run with: python -m unittest test_cube_keys
+"""
+
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+import CubeUtils
+
+ORDER = 4
+TEXT = "Key files must give back every key: 键文件\tand 😀 too.\n" * 3
+
+
+def quiet(func, *args, **kwargs):
+    """Call func with CubeUtils' progress output discarded"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args, **kwargs)
+
+
+class KeyFileTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.ciphertext, self.key_data = quiet(CubeUtils.encrypt_text, TEXT, ORDER, 12, 3)
+
+    def _path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def _assert_same_pool(self, loaded):
+        self.assertEqual(len(loaded['key_pool']), len(self.key_data['key_pool']))
+        for got, expected in zip(loaded['key_pool'], self.key_data['key_pool']):
+            self.assertEqual(got.dtype, np.uint8)
+            np.testing.assert_array_equal(got, expected)
+
+    def _assert_decrypts(self, loaded):
+        plaintext = quiet(CubeUtils.decrypt_text, self.ciphertext, loaded, ORDER)
+        self.assertEqual(plaintext[:len(TEXT)], TEXT)
+
+    def _round_trip(self, key_data, name, **kwargs):
+        path = self._path(name)
+        CubeUtils.save_key_file(path, key_data, **kwargs)
+        return CubeUtils.load_key_file(path, ORDER)
+
+    def test_binary_pool(self):
+        # Without a seed the binary file carries the pool itself
+        key_data = {k: v for k, v in self.key_data.items() if k != 'key_seed'}
+        loaded = self._round_trip(key_data, "pool.key")
+        self.assertNotIn('key_seed', loaded)
+        self._assert_same_pool(loaded)
+        self._assert_decrypts(loaded)
+
+    def test_binary_seeded(self):
+        loaded = self._round_trip(self.key_data, "seeded.key")
+        self.assertEqual(loaded['key_seed'], self.key_data['key_seed'])
+        self._assert_same_pool(loaded)
+        self._assert_decrypts(loaded)
+        # The pool is re-expanded from the seed, not stored
+        header = json.dumps(CubeUtils.key_data_header(self.key_data)).encode('utf-8')
+        self.assertEqual(os.path.getsize(self._path("seeded.key")),
+                         len(CubeUtils.KEY_FILE_MAGIC) + 4 + len(header))
+
+    def test_legacy_json(self):
+        loaded = self._round_trip(self.key_data, "legacy.json", legacy_json=True)
+        with open(self._path("legacy.json")) as kf:
+            self.assertTrue(all(isinstance(move, str) for move in json.load(kf)['key_pool'][0]))
+        self._assert_same_pool(loaded)
+        self._assert_decrypts(loaded)
+
+    def test_tampered_move_count(self):
+        key_data = dict(self.key_data, move_count=self.key_data['move_count'] + 1)
+        path = self._path("tampered.key")
+        CubeUtils.save_key_file(path, key_data)
+        with self.assertRaises(ValueError):
+            CubeUtils.load_key_file(path, ORDER)
+        with self.assertRaises(ValueError):
+            CubeUtils.decrypt_text(self.ciphertext, CubeUtils.key_data_header(key_data), ORDER)
+
+    def test_baseline_json_pool(self):
+        # Key files from before move codes: move names only, no seed or move_count
+        CubeUtils.add_moves_for_larger_cubes(ORDER)
+        names = ["L1", "R1'", "U2", "D3'", "L2", "R2'"]
+        baseline = {
+            'key_pool': [names, names[::-1]],
+            'used_key_indices': [0],
+            'selection_method': "random",
+            'metadata': {'num_cubes': 1, 'key_pool_size': 2, 'moves_per_key': len(names)}
+        }
+        path = self._path("baseline.json")
+        with open(path, 'w') as kf:
+            json.dump(baseline, kf, indent=2)
+
+        loaded = CubeUtils.load_key_file(path, ORDER)
+        np.testing.assert_array_equal(loaded['key_pool'][0], [0, 3, 12, 19, 8, 11])
+        for got, moves in zip(loaded['key_pool'], baseline['key_pool']):
+            np.testing.assert_array_equal(got, CubeUtils.encode_moves(moves))
+            self.assertEqual(CubeUtils.decode_moves(got), moves)
+
+    def test_baseline_json_decrypts(self):
+        baseline = CubeUtils.key_data_to_json(self.key_data)
+        del baseline['key_seed'], baseline['move_count']
+        path = self._path("baseline.json")
+        with open(path, 'w') as kf:
+            json.dump(baseline, kf, indent=2)
+        loaded = CubeUtils.load_key_file(path, ORDER)
+        self._assert_same_pool(loaded)
+        self._assert_decrypts(loaded)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+# encoding:utf-8
+"""
+Regression tests for the CubeUtils move paths.
+
+Checks the packed move codes, the NumPy gather tables and the Numba kernels
+against the original move loop: named moves decoded from moveDict and run
+one at a time with Cube.rotate_LR / Cube.rotate_UD.
+
+Run with: python -m unittest test_cube_moves
+"""
+
+import random
+import unittest
+
+import numpy as np
+
+import CubeUtils
+import cube_kernel
+
+# Odd and even orders, including the smallest cube
+ORDERS = (3, 4, 5, 8)
+
+
+def reference_apply(cube, moves):
+    """Apply named moves one by one, decoding moveDict as the original applyMoves did"""
+    for move in moves:
+        layer, direction = CubeUtils.moveDict[move]
+        if layer % 2 == 0:
+            cube.rotate_LR(layer // 2, direction)
+        else:
+            cube.rotate_UD(layer // 2, direction)
+    return cube
+
+
+def index_cube(order):
+    """Cube whose cells are all distinct, so any misplaced cell shows up"""
+    return CubeUtils.Cube(order, np.arange(6 * order * order, dtype=np.int32))
+
+
+def python_version(func):
+    """The plain Python body of a kernel, whether or not Numba compiled it"""
+    return getattr(func, 'py_func', func)
+
+
+class MovePathTest(unittest.TestCase):
+    def setUp(self):
+        self.rng = random.Random(3387)
+        self._kernel_min_work = CubeUtils._KERNEL_MIN_WORK
+
+    def tearDown(self):
+        CubeUtils._KERNEL_MIN_WORK = self._kernel_min_work
+
+    def _random_moves(self, order, count):
+        CubeUtils.add_moves_for_larger_cubes(order)
+        # Moves of larger cubes are included: they must be no-ops here
+        names = list(CubeUtils.moveDict)
+        return self.rng.choices(names, k=count)
+
+    def _check_move_codes(self):
+        for n in ORDERS:
+            move_lists = [self._random_moves(n, self.rng.randint(1, 80)) for _ in range(6)]
+            expected = [reference_apply(index_cube(n), moves) for moves in move_lists]
+
+            cubes = [index_cube(n) for _ in move_lists]
+            CubeUtils.apply_move_codes(cubes, [CubeUtils.encode_moves(moves) for moves in move_lists])
+            for cube, reference in zip(cubes, expected):
+                np.testing.assert_array_equal(cube.faces, reference.faces)
+
+            for moves, reference in zip(move_lists, expected):
+                np.testing.assert_array_equal(CubeUtils.encryptCube(index_cube(n), moves).faces, reference.faces)
+                np.testing.assert_array_equal(CubeUtils.decryptCube(reference, moves).faces, index_cube(n).faces)
+
+    def test_numpy_tables(self):
+        CubeUtils._KERNEL_MIN_WORK = float('inf')
+        self._check_move_codes()
+
+    @unittest.skipIf(not cube_kernel.HAS_NUMBA, "Numba is not installed")
+    def test_numba_kernel(self):
+        CubeUtils._KERNEL_MIN_WORK = 0
+        self._check_move_codes()
+
+    def test_kernel_python_body(self):
+        apply_moves = python_version(cube_kernel.apply_moves_nb)
+        for n in ORDERS:
+            moves = self._random_moves(n, 60)
+            codes = CubeUtils.encode_moves(moves)
+            faces = index_cube(n).faces
+            apply_moves(faces, codes[codes < 4 * n])
+            np.testing.assert_array_equal(faces, reference_apply(index_cube(n), moves).faces)
+
+    def test_face_rotation_matches_rot90(self):
+        rotate_face = python_version(cube_kernel._rotate_face_nb)
+        for n in ORDERS:
+            for direction, k in ((1, -1), (-1, 1)):
+                faces = index_cube(n).faces
+                expected = np.rot90(faces[2], k=k).copy()
+                rotate_face(faces, 2, direction)
+                np.testing.assert_array_equal(faces[2], expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
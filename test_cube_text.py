@@ -0,0 +1,76 @@
+# encoding:utf-8
+"""
+Tests for the in-process text API of CubeUtils: encrypt_text and
+decrypt_text must give back every character, whitespace included, and
+bruteforce_text must write its per-cube results.
+
+Run with: python -m unittest test_cube_text
+"""
+
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+
+import CubeUtils
+
+# Spaces, tabs and newlines, BMP CJK and astral characters, over several cubes
+TEXT = ("  leading spaces\tand\ttabs\n"
+        "立方体加密 CJK text 文字\n"
+        "astral 😀𝄞𠀋 characters\r\n"
+        "trailing whitespace \t \n") * 4
+ORDERS = (3, 5)
+
+
+def quiet(func, *args, **kwargs):
+    """Call func with CubeUtils' progress output discarded"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args, **kwargs)
+
+
+class TextApiTest(unittest.TestCase):
+    def test_round_trip(self):
+        for order in ORDERS:
+            for method in ("random", "sequential", "hash_based"):
+                with self.subTest(order=order, selection_method=method):
+                    ciphertext, key_data = quiet(CubeUtils.encrypt_text, TEXT, order, 15, 2, method)
+                    capacity = order * order * 6
+                    self.assertEqual(len(ciphertext) % capacity, 0)
+                    self.assertGreaterEqual(len(ciphertext), len(TEXT))
+                    self.assertNotEqual(ciphertext[:len(TEXT)], TEXT)
+
+                    plaintext = quiet(CubeUtils.decrypt_text, ciphertext, key_data, order)
+                    self.assertEqual(plaintext[:len(TEXT)], TEXT)
+
+    def test_round_trip_from_seed(self):
+        ciphertext, key_data = quiet(CubeUtils.encrypt_text, TEXT, 4, 15, 2)
+        for key in (CubeUtils.key_data_header(key_data), CubeUtils.key_data_to_json(key_data)):
+            plaintext = quiet(CubeUtils.decrypt_text, ciphertext, key, 4)
+            self.assertEqual(plaintext[:len(TEXT)], TEXT)
+
+    def test_bruteforce_smoke(self):
+        order = 3
+        ciphertext, key_data = quiet(CubeUtils.encrypt_text, TEXT, order, 10, 2)
+        padded = quiet(CubeUtils.decrypt_text, ciphertext, key_data, order)
+        pool_size = len(key_data['key_pool'])
+        capacity = order * order * 6
+
+        with tempfile.TemporaryDirectory() as results_dir:
+            # Trying the whole pool is sure to include each cube's real key
+            summary = quiet(CubeUtils.bruteforce_text, ciphertext, key_data, order, pool_size, results_dir)
+            self.assertEqual([entry['cube_index'] for entry in summary], list(range(len(ciphertext) // capacity)))
+            self.assertTrue(os.path.exists(os.path.join(results_dir, "decryption_summary.json")))
+
+            for entry in summary:
+                self.assertTrue(os.path.exists(entry['best_file']))
+                i = entry['cube_index']
+                with open(os.path.join(results_dir, f"cube_{i}_all_attempts.json"), encoding='utf-8') as f:
+                    attempts = {attempt['key_index']: attempt['decrypted_text'] for attempt in json.load(f)}
+                self.assertEqual(len(attempts), pool_size)
+                self.assertEqual(attempts[key_data['used_key_indices'][i]], padded[i * capacity:(i + 1) * capacity])
+
+
+if __name__ == "__main__":
+    unittest.main()